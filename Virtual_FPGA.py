@@ -1,9 +1,29 @@
 from itertools import count
+from functools import lru_cache
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import heapq
+import ast
 import re
 import itertools
 import json
+import random
+import csv
+import hashlib
+import marshal
+import os
+import sys
+import ctypes
+import shutil
+import subprocess
+from array import array
 from graphviz import Digraph
 
+try:
+    import numpy as np
+except ImportError:  # NumPy only backs the vectorized truth table helpers
+    np = None
+
 def find_literals(expre):
     output, input_list = expre.split('=')
     input_chars = set()
@@ -11,13 +31,661 @@ def find_literals(expre):
         input_chars.add(char.rstrip("_'"))
     return output, sorted(input_chars)
 
+@lru_cache(maxsize=None)
+def column_masks(k):
+    """
+    Returns the truth table columns of a k-input LUT as integers.
+
+    Bit r of the i-th mask is the value of the i-th literal in row r, so the first literal is
+    the most significant address bit, matching the row order of itertools.product.
+    """
+    masks = []
+    for i in range(k):
+        shift = k - 1 - i
+        masks.append(sum(1 << row for row in range(1 << k) if row >> shift & 1))
+    return tuple(masks)
+
+@lru_cache(maxsize=None)
+def address_weights(k):
+    """
+    Returns the truth table address weight of each literal position of a k-input LUT.
+    """
+    return tuple(1 << (k - 1 - i) for i in range(k))
+
+@lru_cache(maxsize=4096)
+def pin_weights(pins, literals):
+    """
+    Returns the truth table address weight of each input pin of a LUT.
+
+    Pins "x" and "x_" both carry the value of net x and map to the weight of literal x. Only the first pin
+    of each literal gets its weight, the repeated ones get 0, so an address is the plain sum of the weights
+    of the pins set to 1.
+    """
+    weights = dict(zip(literals, address_weights(len(literals))))
+    missing = set(literals) - {pin.rstrip("_'") for pin in pins}
+    if missing:
+        raise Exception(f"Literals {sorted(missing)} of the logic are not inputs of the LUT")
+    result = []
+    for pin in pins:
+        result.append(weights.pop(pin.rstrip("_'"), 0))
+    return tuple(result)
+
+@lru_cache(maxsize=None)
+def input_matrix(k):
+    """
+    Returns the read-only 2^k x k boolean input matrix of a k-input LUT, built once per arity.
+    Row r holds the literal values of truth table row r, in itertools.product order.
+    """
+    if np is None:
+        raise Exception("NumPy is required for the vectorized truth table backend")
+    rows = np.arange(1 << k)[:, None]
+    shifts = np.arange(k - 1, -1, -1)[None, :]
+    matrix = ((rows >> shifts) & 1).astype(bool)
+    matrix.setflags(write=False)
+    return matrix
+
+def truth_tables_numpy(expressions):
+    """
+    Computes the truth tables of many logic expressions with whole-column NumPy operations.
+
+    Args:
+    expressions (iterable): Logic expressions in the format "output_var = input_expression".
+
+    Returns:
+    list: One (literals, init) tuple per expression, as returned by LUT.logic_to_init.
+    """
+    programs = [LogicProgram(expre) for expre in expressions]
+    results = [None] * len(programs)
+
+    # Group the expressions by arity so they share one input matrix and one packbits call
+    by_arity = {}
+    for i, program in enumerate(programs):
+        by_arity.setdefault(len(program.literals), []).append(i)
+
+    for k, indices in by_arity.items():
+        columns = list(input_matrix(k).T)
+        ones = np.ones(1 << k, dtype=bool)
+        outputs = np.stack([programs[i].run(columns, ones) for i in indices])
+        packed = np.packbits(outputs, axis=1, bitorder='little')
+        for i, row in zip(indices, packed):
+            results[i] = (programs[i].literals, int.from_bytes(row.tobytes(), 'little'))
+
+    return results
+
+class LogicProgram:
+    """
+    A logic expression parsed once and compiled to a stack program of bitwise operations.
+
+    Running the program on the truth table columns evaluates every row in a single pass.
+    """
+    def __init__(self, expre):
+        # Extract the right-hand side and rewrite it with the same operator mapping eval used
+        simple_expre = expre.split('=')[1]
+        simple_expre = re.sub(r"([A-Za-z0-9]+)'", r"\1_", simple_expre)
+        simple_expre = simple_expre.replace('*', ' and ').replace('+', ' or ')
+
+        tree = ast.parse(simple_expre.strip(), mode='eval')
+        literals = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                literals.add(node.id.rstrip("_"))
+        self.literals = sorted(literals)
+        self.index = {lit: i for i, lit in enumerate(self.literals)}
+        self.program = []
+        self.compile(tree.body)
+
+    def compile(self, node):
+        """
+        Appends the postfix instructions for an AST node to the program.
+        """
+        if isinstance(node, ast.Name):
+            base = node.id.rstrip("_")
+            # An odd number of trailing underscores inverts the literal
+            inverted = (len(node.id) - len(base)) % 2 == 1
+            self.program.append(('nlit' if inverted else 'lit', self.index[base]))
+        elif isinstance(node, ast.Constant) and node.value in (0, 1):
+            self.program.append(('const', bool(node.value)))
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.Invert)):
+            self.compile(node.operand)
+            self.program.append(('not', 1))
+        elif isinstance(node, ast.BoolOp):
+            for value in node.values:
+                self.compile(value)
+            self.program.append(('and' if isinstance(node.op, ast.And) else 'or', len(node.values)))
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr, ast.BitXor)):
+            self.compile(node.left)
+            self.compile(node.right)
+            op = {ast.BitAnd: 'and', ast.BitOr: 'or', ast.BitXor: 'xor'}[type(node.op)]
+            self.program.append((op, 2))
+        else:
+            raise Exception(f"Unsupported syntax in logic expression: {ast.dump(node)}")
+
+    def run(self, columns, ones):
+        """
+        Executes the program.
+
+        Args:
+        columns (sequence): One bit vector per literal, ordered as self.literals.
+        ones: The all-ones bit vector of the same width (e.g. (1 << rows) - 1).
+
+        Returns:
+        The bit vector of the expression, of the same type as the columns.
+        """
+        stack = []
+        for op, arg in self.program:
+            if op == 'lit':
+                stack.append(columns[arg])
+            elif op == 'nlit':
+                stack.append(ones ^ columns[arg])
+            elif op == 'const':
+                stack.append(ones if arg else ones ^ ones)
+            elif op == 'not':
+                stack.append(ones ^ stack.pop())
+            else:
+                operands = stack[-arg:]
+                del stack[-arg:]
+                result = operands[0]
+                for operand in operands[1:]:
+                    if op == 'and':
+                        result = result & operand
+                    elif op == 'or':
+                        result = result | operand
+                    else:
+                        result = result ^ operand
+                stack.append(result)
+        return stack.pop()
+
+def tt_flip_input(init, k, i):
+    """
+    Negates the i-th input of a k-input truth table by swapping its two cofactors.
+    """
+    mask = column_masks(k)[i]
+    full = (1 << (1 << k)) - 1
+    shift = 1 << (k - 1 - i)
+    return ((init & mask) >> shift) | ((init & (full ^ mask)) << shift)
+
+def tt_swap_inputs(init, k, i, j):
+    """
+    Exchanges the i-th and j-th inputs of a k-input truth table.
+    """
+    if i == j:
+        return init
+    if i > j:
+        i, j = j, i
+    masks = column_masks(k)
+    full = (1 << (1 << k)) - 1
+    # Rows where input i is 1 and input j is 0 trade places with rows where i is 0 and j is 1
+    down = masks[i] & (full ^ masks[j])
+    up = masks[j] & (full ^ masks[i])
+    shift = (1 << (k - 1 - i)) - (1 << (k - 1 - j))
+    return (init & (full ^ down ^ up)) | ((init & down) >> shift) | ((init & up) << shift)
+
+def tt_permute_inputs(init, k, perm):
+    """
+    Reorders the inputs of a k-input truth table so that position j holds the original input perm[j].
+    """
+    order = list(range(k))
+    for j, source in enumerate(perm):
+        p = order.index(source)
+        if p != j:
+            init = tt_swap_inputs(init, k, j, p)
+            order[j], order[p] = order[p], order[j]
+    return init
+
+def tt_cofactor(init, k, i, value):
+    """
+    Fixes the i-th input of a k-input truth table to value.
+
+    Returns:
+    int: The (k-1)-input truth table over the remaining inputs, in their original order.
+    """
+    low = 1 << (k - 1 - i)
+    block = (1 << low) - 1
+    result = 0
+    for hi in range(1 << i):
+        result |= ((init >> ((hi * 2 + value) * low)) & block) << (hi * low)
+    return result
+
+def tt_insert_input(init, k, i):
+    """
+    Inserts a vacuous input at position i of a k-input truth table, giving a (k+1)-input table.
+    """
+    low = 1 << (k - i)
+    block = (1 << low) - 1
+    result = 0
+    for hi in range(1 << i):
+        chunk = (init >> (hi * low)) & block
+        result |= (chunk | chunk << low) << (hi * 2 * low)
+    return result
+
+def tt_depends_on(init, k, i):
+    """
+    Returns True if the output of a k-input truth table changes with its i-th input.
+    """
+    mask = column_masks(k)[i]
+    shift = 1 << (k - 1 - i)
+    return ((init >> shift) ^ init) & ((1 << (1 << k)) - 1 ^ mask) != 0
+
+def tt_support(init, k):
+    """
+    Returns the positions of the inputs a k-input truth table actually depends on.
+    """
+    return [i for i in range(k) if tt_depends_on(init, k, i)]
+
+def tt_reduce_support(init, literals):
+    """
+    Drops the vacuous inputs of a truth table.
+
+    Returns:
+    tuple: The literals in the support and the truth table over them.
+    """
+    k = len(literals)
+    support = tt_support(init, k)
+    for i in reversed(range(k)):
+        if i not in support:
+            init = tt_cofactor(init, k, i, 0)
+            k -= 1
+    return [literals[i] for i in support], init
+
+def tt_rebase(init, literals, new_literals):
+    """
+    Re-expresses a truth table over a sorted superset of its sorted literals.
+    """
+    k = len(literals)
+    for i, lit in enumerate(new_literals):
+        if k == len(new_literals):
+            break
+        if i >= k or literals[i] != lit:
+            init = tt_insert_input(init, k, i)
+            literals = literals[:i] + [lit] + literals[i:]
+            k += 1
+    return init
+
+def tt_compose(f_init, f_literals, literal, g_init, g_literals):
+    """
+    Substitutes the function g for one literal of f.
+
+    Returns:
+    tuple: The sorted literals of the composition and its truth table.
+    """
+    i = f_literals.index(literal)
+    k = len(f_literals)
+    rest = f_literals[:i] + f_literals[i + 1:]
+    literals = sorted(set(rest) | set(g_literals))
+    f0 = tt_rebase(tt_cofactor(f_init, k, i, 0), rest, literals)
+    f1 = tt_rebase(tt_cofactor(f_init, k, i, 1), rest, literals)
+    g = tt_rebase(g_init, g_literals, literals)
+    full = (1 << (1 << len(literals))) - 1
+    return literals, (g & f1) | ((full ^ g) & f0)
+
+def truth_table_to_logic(output_var, literals, init):
+    """
+    Writes a truth table as a sum of minterms, e.g. "Q = a & b_ | a_ & b", or a constant "Q = 0".
+    """
+    k = len(literals)
+    if init == 0:
+        return f"{output_var} = 0"
+    if init == (1 << (1 << k)) - 1:
+        return f"{output_var} = 1"
+    minterms = []
+    for row in range(1 << k):
+        if init >> row & 1:
+            minterms.append(' & '.join(lit if row >> (k - 1 - i) & 1 else lit + "_" for i, lit in enumerate(literals)))
+    return f"{output_var} = {' | '.join(minterms)}"
+
+@lru_cache(maxsize=None)
+def npn_table(k):
+    """
+    Returns the exact NPN canonical form of every k-input function (k <= 4), as a list indexed by INIT word.
+
+    The canonical form is the smallest INIT word reachable by negating inputs, permuting inputs and
+    negating the output. The table is built once, one equivalence class at a time, so each class orbit
+    is enumerated exactly once (222 classes for k = 4).
+    """
+    if k > 4:
+        raise Exception("Exact NPN tables are only built for up to 4 inputs")
+    size = 1 << (1 << k)
+    full = size - 1
+    table = [None] * size
+    for init in range(size):
+        if table[init] is not None:
+            continue
+        orbit = set()
+        for perm in itertools.permutations(range(k)):
+            t = tt_permute_inputs(init, k, perm)
+            # Walk all input negations in Gray code order, one flip per step
+            for step in range(1 << k):
+                if step:
+                    t = tt_flip_input(t, k, (step & -step).bit_length() - 1)
+                orbit.add(t)
+                orbit.add(full ^ t)
+        canonical = min(orbit)
+        for member in orbit:
+            table[member] = canonical
+    return table
+
+@lru_cache(maxsize=None)
+def npn_classes(k):
+    """
+    Returns the sorted canonical representatives of the k-input NPN classes (k <= 4).
+    """
+    return sorted(set(npn_table(k)))
+
+@lru_cache(maxsize=None)
+def npn_class_ids(k):
+    """
+    Maps each canonical representative of npn_classes(k) to its index.
+    """
+    return {canonical: index for index, canonical in enumerate(npn_classes(k))}
+
+def npn_class_index(init, k):
+    """
+    Returns the index of a k-input function's NPN class in npn_classes(k) (k <= 4).
+    """
+    return npn_class_ids(k)[npn_table(k)[init]]
+
+def npn_heuristic(init, k, max_ties=720):
+    """
+    Computes a fast, signature-based NPN representative for functions of up to 6 inputs.
+
+    The output is negated so that at most half of the rows are 1, every input is negated so that its
+    positive cofactor holds at least as many ones as the negative one, and inputs are sorted by the
+    weight of their positive cofactor. Ties (balanced inputs and inputs of equal weight) are resolved
+    by trying every arrangement and keeping the smallest INIT word, as long as there are at most
+    max_ties of them. Equal functions always get the same representative; equivalent functions get
+    the same one unless the tie limit was hit.
+    """
+    full = (1 << (1 << k)) - 1
+    masks = column_masks(k)
+    ones = init.bit_count()
+    if ones * 2 < (1 << k):
+        candidates = [init]
+    elif ones * 2 > (1 << k):
+        candidates = [full ^ init]
+    else:
+        candidates = [init, full ^ init]
+
+    best = None
+    for t in candidates:
+        balanced = []
+        for i in range(k):
+            positive = (t & masks[i]).bit_count() * 2
+            if positive < t.bit_count():
+                t = tt_flip_input(t, k, i)
+            elif positive == t.bit_count():
+                balanced.append(i)
+
+        # Inputs of equal cofactor weight can appear in any order
+        weights = [(t & masks[i]).bit_count() for i in range(k)]
+        order = sorted(range(k), key=lambda i: -weights[i])
+        groups = [list(group) for _, group in itertools.groupby(order, key=lambda i: weights[i])]
+        arrangements = 1 << len(balanced)
+        for group in groups:
+            for size in range(2, len(group) + 1):
+                arrangements *= size
+        if arrangements > max_ties:
+            groups = [[i] for i in order]
+            balanced = []
+
+        for phases in itertools.product([False, True], repeat=len(balanced)):
+            flipped = t
+            for i, flip in zip(balanced, phases):
+                if flip:
+                    flipped = tt_flip_input(flipped, k, i)
+            for perms in itertools.product(*(itertools.permutations(group) for group in groups)):
+                candidate = tt_permute_inputs(flipped, k, [i for perm in perms for i in perm])
+                if best is None or candidate < best:
+                    best = candidate
+    return best
+
+def npn_canonical(init, k):
+    """
+    Returns the NPN canonical form of a k-input truth table: exact up to 4 inputs, heuristic for 5 and 6.
+    """
+    if k <= 4:
+        return npn_table(k)[init]
+    if k <= 6:
+        return npn_heuristic(init, k)
+    raise Exception("NPN canonicalization supports at most 6 inputs")
+
+class LUTFunction:
+    """
+    An interned Boolean function, shared by every LUT that implements it.
+    """
+    __slots__ = ('k', 'init', 'npn')
+
+    def __init__(self, k, init):
+        self.k = k
+        self.init = init
+        self.npn = None
+
+    def npn_canonical(self):
+        """
+        NPN canonical form of the function, computed once and cached on the shared object.
+        """
+        if self.npn is None:
+            self.npn = npn_canonical(self.init, self.k)
+        return self.npn
+
+    def __repr__(self):
+        return f"LUTFunction(k={self.k}, init={self.init:#x})"
+
+class FunctionStore:
+    """
+    Hash-consed store of LUT functions with bounded LRU eviction.
+
+    Functions are interned by their truth table (arity, INIT word), and expressions are memoized by
+    their normalized logic string, in which literals are renamed by their sorted position. Every
+    k-input AND produced by decompose_term therefore resolves to the same LUTFunction after the
+    first one has been evaluated.
+    """
+    KEYWORDS = {'and', 'or', 'not', 'True', 'False'}
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.by_logic = OrderedDict()
+        self.by_table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def normalize(self, expre):
+        """
+        Normalizes the right-hand side of an expression.
+
+        Returns:
+        tuple: The sorted literals and the tokenized expression with every literal replaced by its
+        position (e.g. "Int3 = c&a_" becomes (['a', 'c'], "v1 & v0_")).
+        """
+        simple_expre = re.sub(r"([A-Za-z0-9]+)'", r"\1_", expre.split('=')[1])
+        tokens = re.findall(r'[A-Za-z0-9_]+|\S', simple_expre)
+        literals = sorted({token.rstrip("_") for token in tokens
+                           if (token[0].isalpha() or token[0] == '_') and token not in self.KEYWORDS})
+        position = {lit: i for i, lit in enumerate(literals)}
+
+        normalized = []
+        for token in tokens:
+            base = token.rstrip("_")
+            if base in position and token not in self.KEYWORDS:
+                token = f"v{position[base]}{token[len(base):]}"
+            normalized.append(token)
+        return literals, ' '.join(normalized)
+
+    def intern(self, k, init):
+        """
+        Returns the shared LUTFunction for a truth table, creating it if needed.
+        """
+        key = (k, init)
+        function = self.by_table.get(key)
+        if function is None:
+            function = LUTFunction(k, init)
+            self.by_table[key] = function
+            if len(self.by_table) > self.maxsize:
+                self.by_table.popitem(last=False)
+        else:
+            self.by_table.move_to_end(key)
+        return function
+
+    def lookup(self, expre):
+        """
+        Resolves an expression to its literals and shared LUTFunction, evaluating it only on a miss.
+        """
+        literals, key = self.normalize(expre)
+        function = self.by_logic.get(key)
+        if function is not None:
+            self.hits += 1
+            self.by_logic.move_to_end(key)
+            return literals, function
+
+        self.misses += 1
+        program = LogicProgram(expre)
+        k = len(program.literals)
+        function = self.intern(k, program.run(column_masks(k), (1 << (1 << k)) - 1))
+        self.by_logic[key] = function
+        if len(self.by_logic) > self.maxsize:
+            self.by_logic.popitem(last=False)
+        return literals, function
+
+    def clear(self):
+        """
+        Drops every interned function and resets the hit counters.
+        """
+        self.by_logic.clear()
+        self.by_table.clear()
+        self.hits = 0
+        self.misses = 0
+
+# Global store shared by all LUTs
+function_store = FunctionStore()
+
 class LUT:
+    __slots__ = ('input', 'output', 'bits', '_logic', '_literals', '_function', '_weights')
+
     def __init__(self, input_vars, output_var, logic):
         self.input = input_vars
         self.output = output_var
         self.bits = len(input_vars)
         self.logic = logic
-        self.truth_table = self.logic_to_truth_table(logic)
+
+    @property
+    def logic(self):
+        return self._logic
+
+    @logic.setter
+    def logic(self, expre):
+        # The function is resolved on first use and invalidated whenever the logic changes
+        self._logic = expre
+        self._literals = None
+        self._function = None
+        self._weights = None
+
+    def resolve_function(self):
+        """
+        Looks the logic up in the global function store.
+        """
+        self._literals, self._function = function_store.lookup(self._logic)
+
+    @property
+    def literals(self):
+        """
+        Sorted literals addressing the truth table, computed lazily from the logic.
+        """
+        if self._literals is None:
+            self.resolve_function()
+        return self._literals
+
+    @property
+    def function(self):
+        """
+        Shared LUTFunction interned in the global function store, resolved lazily from the logic.
+        """
+        if self._function is None:
+            self.resolve_function()
+        return self._function
+
+    @property
+    def init(self):
+        """
+        INIT word of the LUT.
+        """
+        return self.function.init
+
+    def npn_key(self):
+        """
+        Key shared by all LUTs whose functions are NPN-equivalent, e.g. "a & b_" and "b & a_".
+        """
+        return len(self.literals), self.function.npn_canonical()
+
+    def support(self):
+        """
+        Returns the literals the LUT output actually depends on.
+        """
+        literals = self.literals
+        return [literals[i] for i in tt_support(self.init, len(literals))]
+
+    def redundant_inputs(self):
+        """
+        Returns the input pins whose literal does not affect the output, e.g. both pins of "a & a_".
+        """
+        support = set(self.support())
+        return [name for name in self.input if name.rstrip("_'") not in support]
+
+    def cofactor(self, literal, value):
+        """
+        Returns a new LUT with one literal fixed to a constant value.
+        """
+        literals = self.literals
+        i = literals.index(literal)
+        init = tt_cofactor(self.init, len(literals), i, value)
+        return LUT.from_truth_table(self.output, literals[:i] + literals[i + 1:], init)
+
+    def reduce_support(self):
+        """
+        Returns a new LUT without the vacuous inputs.
+        """
+        literals, init = tt_reduce_support(self.init, self.literals)
+        return LUT.from_truth_table(self.output, literals, init)
+
+    def compose(self, driver):
+        """
+        Returns a new LUT that absorbs a driving LUT into this one, replacing its output literal.
+        """
+        literals, init = tt_compose(self.init, self.literals, driver.output, driver.init, driver.literals)
+        return LUT.from_truth_table(self.output, literals, init)
+
+    @classmethod
+    def from_truth_table(cls, output_var, literals, init):
+        """
+        Builds a LUT from a truth table, with a sum-of-minterms logic string and the table already cached.
+        Constant tables are stored without inputs, matching how their logic string parses.
+        """
+        if init in (0, (1 << (1 << len(literals))) - 1):
+            literals, init = [], init & 1
+        lut = cls(list(literals), output_var, truth_table_to_logic(output_var, literals, init))
+        lut.cache_truth_table(list(literals), init)
+        return lut
+
+    def cache_truth_table(self, literals, init):
+        """
+        Stores a truth table computed elsewhere (e.g. by a batch backend) for the current logic.
+        """
+        self._literals, self._function = literals, function_store.intern(len(literals), init)
+        self._weights = None
+
+    def logic_to_init(self, expre):
+        """
+        Converts a logic expression to an INIT word, the 2^k-bit integer real FPGAs load into a LUT.
+
+        Args:
+        expre (str): A logic expression in the format "output_var = input_expression".
+
+        Returns:
+        tuple: The sorted literals addressing the LUT and the INIT word, where bit i holds the output
+        for the i-th row of the truth table (the first literal is the most significant address bit).
+        """
+        program = LogicProgram(expre)
+        k = len(program.literals)
+        init = program.run(column_masks(k), (1 << (1 << k)) - 1)
+        return program.literals, init
 
     def logic_to_truth_table(self, expre):
         """
@@ -29,50 +697,1352 @@ class LUT:
         Returns:
         dict: A dictionary representing the truth table, mapping input value tuples to output values.
         """
-        # Define possible binary values for truth table
-        val = [0, 1]
-        truth_dic = {}
+        literals, init = self.logic_to_init(expre)
+        return {values: bool(init >> address & 1)
+                for address, values in enumerate(itertools.product([0, 1], repeat=len(literals)))}
 
-        # Extract the right-hand side of the equation for evaluation
-        simple_expre = expre.split('=')[1]
+    @property
+    def truth_table(self):
+        """
+        Dictionary view of the INIT word, built on demand.
+        """
+        return {values: bool(self.init >> address & 1)
+                for address, values in enumerate(itertools.product([0, 1], repeat=len(self.literals)))}
 
-        # Collect unique literals while handling inverse notation (e.g., a')
-        literals = set()
-        for literal in re.findall(r'[A-Za-z0-9]+', simple_expre):
-            literals.add(literal.rstrip("_'"))  # Remove any inverse notation
-        literals = sorted(literals)
+    @property
+    def weights(self):
+        """
+        Truth table address weight of each input pin (see pin_weights), computed once per LUT.
+        """
+        if self._weights is None:
+            self._weights = pin_weights(tuple(self.input), tuple(self.literals))
+        return self._weights
 
-        # Replace logical operators for Python's eval function
-        simple_expre = simple_expre.replace('*', ' and ').replace('+', ' or ')
+    def address(self, values):
+        """
+        Computes the truth table row selected by a sequence of literal values, ordered as in self.literals.
+        """
+        if len(values) != len(self.literals):
+            raise Exception(f"Expected {len(self.literals)} literal values, got {len(values)}")
+        return sum(weight for weight, value in zip(address_weights(len(values)), values) if value)
+
+    def lookup(self, values):
+        """
+        Looks up the output for a tuple of literal values, ordered as in self.literals.
+        """
+        return bool(self.init >> self.address(values) & 1)
+
+    def evaluate(self, bits):
+        """
+        Evaluates the LUT for one input vector.
+
+        Args:
+        bits (sequence): One 0/1 value per input pin, ordered as self.input. Pins "x" and "x_" both take
+        the value of net x.
+
+        Returns:
+        int: The output bit.
+        """
+        weights = self.weights
+        if len(bits) != len(weights):
+            raise Exception(f"Expected {len(weights)} input values, got {len(bits)}")
+        return self.init >> sum(weight for weight, value in zip(weights, bits) if value) & 1
+
+    def evaluate_many(self, matrix):
+        """
+        Evaluates the LUT for many input vectors.
+
+        Args:
+        matrix: Rows of 0/1 values ordered as self.input, as a list of sequences or a 2D NumPy array.
+
+        Returns:
+        A NumPy uint8 array for array input, otherwise a list of output bits.
+        """
+        init = self.init
+        weights = self.weights
+        if np is not None and isinstance(matrix, np.ndarray):
+            if matrix.ndim != 2 or matrix.shape[1] != len(weights):
+                raise Exception(f"Expected rows of {len(weights)} input values")
+            addresses = matrix.astype(np.uint64) @ np.array(weights, dtype=np.uint64)
+            return ((np.uint64(init) >> addresses) & np.uint64(1)).astype(np.uint8)
+        if any(len(row) != len(weights) for row in matrix):
+            raise Exception(f"Expected rows of {len(weights)} input values")
+        if np is not None and isinstance(matrix, np.ndarray):
+            addresses = matrix.astype(np.uint64) @ np.array(weights, dtype=np.uint64)
+            return ((np.uint64(init) >> addresses) & np.uint64(1)).astype(np.uint8)
+        return [init >> sum(weight for weight, value in zip(weights, row) if value) & 1 for row in matrix]
+
+
+class LUTView(LUT):
+    """
+    LUT interface over one entry of a LUTBank.
+
+    Reads and writes go straight to the bank's arrays, so views are cheap to create and hold no state.
+    The input and literal lists are rebuilt on each access, so they must not be modified in place.
+    """
+    __slots__ = ('bank', 'index')
+
+    def __init__(self, bank, index):
+        self.bank = bank
+        self.index = index
+
+    @property
+    def input(self):
+        bank = self.bank
+        return [bank.net_names[net] for net in
+                bank.input_ids[bank.input_offsets[self.index]:bank.input_offsets[self.index + 1]]]
+
+    @property
+    def output(self):
+        return self.bank.net_names[self.bank.output_ids[self.index]]
+
+    @property
+    def bits(self):
+        return self.bank.arity[self.index]
+
+    @property
+    def logic(self):
+        return self.bank.logic[self.index]
+
+    @logic.setter
+    def logic(self, expre):
+        self.bank.logic[self.index] = expre
+        self.bank.init_valid[self.index] = 0
+        self.bank.version += 1
+        self.bank.literal_count[self.index] = LUTBank.UNRESOLVED
+
+    def resolve_function(self):
+        """
+        Looks the logic up in the global function store and records the literals and INIT word in the bank.
+        """
+        literals, function = function_store.lookup(self.logic)
+        # LUTs too wide for the INIT array resolve on every read; their literals are only stored once
+        if self.bank.literal_count[self.index] == LUTBank.UNRESOLVED:
+            self.bank.store_literals(self.index, literals)
+        self.bank.store_init(self.index, function.k, function.init)
+        return function
+
+    @property
+    def literals(self):
+        literals = self.bank.literals(self.index)
+        if literals is None:
+            self.resolve_function()
+            literals = self.bank.literals(self.index)
+        return literals
+
+    @property
+    def function(self):
+        bank = self.bank
+        if bank.init_valid[self.index]:
+            return function_store.intern(bank.k[self.index], bank.init[self.index])
+        return self.resolve_function()
+
+    @property
+    def init(self):
+        bank = self.bank
+        if bank.init_valid[self.index]:
+            return bank.init[self.index]
+        return self.resolve_function().init
+
+    @property
+    def weights(self):
+        return pin_weights(tuple(self.input), tuple(self.literals))
+
+    def cache_truth_table(self, literals, init):
+        self.bank.store_literals(self.index, literals)
+        self.bank.store_init(self.index, len(literals), init)
+
+class LUTBank:
+    """
+    Struct-of-arrays storage for the LUTs of a design.
+
+    Net names are interned to integer ids; every LUT is described by its input net ids (a flat array
+    indexed by offsets), its arity, its INIT word, its output net id and, once its logic was resolved,
+    the net ids of its sorted literals. The only Python objects kept per LUT are the logic strings.
+    Indexing and iteration return LUTView objects, so a LUTBank can be used wherever a list of LUT
+    objects was expected.
+    """
+    # literal_count of a LUT whose logic was not resolved yet
+    UNRESOLVED = 0xFFFF
+
+    def __init__(self, luts=()):
+        # Increased whenever a LUT is added or its logic changes, so schedules built from the bank can tell
+        # they are stale
+        self.version = 0
+        self.net_names = []
+        self.net_ids = {}
+        self.drivers = {}
+        self.input_offsets = array('Q', [0])
+        self.input_ids = array('I')
+        self.arity = array('B')
+        self.k = array('B')
+        self.init = array('Q')
+        self.init_valid = bytearray()
+        self.output_ids = array('I')
+        # Literals are appended at the end of literal_ids; a LUT whose logic changes gets a new range
+        self.literal_start = array('Q')
+        self.literal_count = array('H')
+        self.literal_ids = array('I')
+        self.logic = []
+        for lut in luts:
+            self.append(lut)
+
+    def net_id(self, name):
+        """
+        Returns the id of a net, allocating one for names not seen yet.
+        """
+        net = self.net_ids.get(name)
+        if net is None:
+            net = len(self.net_names)
+            self.net_ids[name] = net
+            self.net_names.append(name)
+        return net
+
+    def add(self, input_vars, output_var, logic):
+        """
+        Appends a LUT without building a LUT object and returns its index.
+        """
+        index = len(self.logic)
+        self.input_ids.extend(self.net_id(name) for name in input_vars)
+        self.input_offsets.append(len(self.input_ids))
+        self.arity.append(len(input_vars))
+        self.k.append(0)
+        self.init.append(0)
+        self.init_valid.append(0)
+        self.output_ids.append(self.net_id(output_var))
+        self.literal_start.append(0)
+        self.literal_count.append(self.UNRESOLVED)
+        self.drivers.setdefault(output_var, index)
+        self.logic.append(logic)
+        self.version += 1
+        return index
+
+    def append(self, lut):
+        index = self.add(lut.input, lut.output, lut.logic)
+        # Keep a truth table that was already resolved on the LUT
+        literals = lut.bank.literals(lut.index) if isinstance(lut, LUTView) else lut._literals
+        if literals is not None:
+            self.store_literals(index, literals)
+            self.store_init(index, len(literals), lut.function.init)
+
+    def extend(self, luts):
+        for lut in luts:
+            self.append(lut)
+
+    def store_init(self, index, k, init):
+        # INIT words wider than 64 bits cannot live in the array and are resolved from the logic each time
+        if k <= 6:
+            self.k[index] = k
+            self.init[index] = init
+            self.init_valid[index] = 1
+
+    def store_literals(self, index, literals):
+        # Literals stored again (e.g. by repeated build_truth_tables calls) reuse the LUT's range when they fit
+        count = self.literal_count[index]
+        if count != self.UNRESOLVED and count == len(literals):
+            start = self.literal_start[index]
+            self.literal_ids[start:start + count] = array('I', [self.net_id(name) for name in literals])
+            return
+        self.literal_start[index] = len(self.literal_ids)
+        self.literal_count[index] = len(literals)
+        self.literal_ids.extend(self.net_id(name) for name in literals)
+
+    def literals(self, index):
+        """
+        Returns the sorted literals of a LUT, or None when its logic was not resolved yet.
+        """
+        count = self.literal_count[index]
+        if count == self.UNRESOLVED:
+            return None
+        start = self.literal_start[index]
+        net_names = self.net_names
+        return [net_names[net] for net in self.literal_ids[start:start + count]]
+
+    def driver(self, name):
+        """
+        Returns the index of the first LUT driving a net, or None.
+        """
+        return self.drivers.get(name)
+
+    def __len__(self):
+        return len(self.logic)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [LUTView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("LUT index out of range")
+        return LUTView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield LUTView(self, index)
+
+@lru_cache(maxsize=4096)
+def lut_minterms(init, k):
+    """
+    Returns the minterms used to evaluate a k-input function on bit-parallel words.
+
+    Returns:
+    tuple: A flag telling whether the complement was taken (when more than half of the rows are 1)
+    and one tuple of literal polarities per minterm of the (possibly complemented) function.
+    """
+    rows = 1 << k
+    invert = init.bit_count() * 2 > rows
+    if invert:
+        init ^= (1 << rows) - 1
+    minterms = tuple(tuple(row >> (k - 1 - i) & 1 for i in range(k)) for row in range(rows) if init >> row & 1)
+    return invert, minterms
+
+def evaluate_words(init, words, ones):
+    """
+    Evaluates a LUT on bit-parallel words, where bit i of every word is the value under test vector i.
+
+    Args:
+    init (int): INIT word of the LUT.
+    words (list): One word per literal, ordered as the LUT literals (Python ints or NumPy arrays).
+    ones: The all-ones word of the same width.
+
+    Returns:
+    The output word: the OR over the minterms of the AND of the literal words or their complements.
+    """
+    invert, minterms = lut_minterms(init, len(words))
+    inverted = [ones ^ word for word in words]
+    result = ones ^ ones
+    for minterm in minterms:
+        term = ones
+        for polarity, word, inverse in zip(minterm, words, inverted):
+            term = term & (word if polarity else inverse)
+        result = result | term
+    return ones ^ result if invert else result
+
+def evaluate_ternary(init, values):
+    """
+    Evaluates a LUT in three-valued logic.
+
+    Args:
+    init (int): INIT word of the LUT.
+    values (list): One value per literal: 0, 1 or None for unknown (X).
+
+    Returns:
+    0 or 1 when every row compatible with the known inputs agrees, None otherwise.
+    """
+    k = len(values)
+    rows = (1 << (1 << k)) - 1
+    care = rows
+    for mask, value in zip(column_masks(k), values):
+        if value is not None:
+            care &= mask if value else rows ^ mask
+    on = init & care
+    if on == 0:
+        return 0
+    if on == care:
+        return 1
+    return None
+
+def count_toggles(word, n_vectors):
+    """
+    Counts the value changes of a net between consecutive vectors of a bit-parallel word.
+
+    Bit i of word ^ (word >> 1) is set when vectors i and i + 1 differ, so the toggles are its popcount
+    over the first n_vectors - 1 bits.
+    """
+    if n_vectors < 2:
+        return 0
+    return ((word ^ word >> 1) & (1 << n_vectors - 1) - 1).bit_count()
+
+def pack_vectors(matrix):
+    """
+    Packs a (vectors x signals) 0/1 matrix into NumPy uint64 words, 64 vectors per word.
+
+    Returns:
+    ndarray: A (signals x words) uint64 array; bit i of word w holds vector 64 * w + i.
+    """
+    matrix = np.asarray(matrix, dtype=bool)
+    n_words = -(-len(matrix) // 64)
+    packed = np.packbits(matrix, axis=0, bitorder='little')
+    padded = np.zeros((n_words * 8, matrix.shape[1]), dtype=np.uint8)
+    padded[:len(packed)] = packed
+    return np.ascontiguousarray(padded.T).view('<u8')
+
+def unpack_vectors(words, n_vectors):
+    """
+    Unpacks (signals x words) uint64 words back into a (vectors x signals) uint8 matrix.
+    """
+    words = np.ascontiguousarray(words, dtype='<u8')
+    bits = np.unpackbits(words.view(np.uint8), axis=1, bitorder='little')
+    return np.ascontiguousarray(bits[:, :n_vectors].T)
+
+def words_expression(init, operands):
+    """
+    Writes the bit-parallel evaluation of a LUT as a Python expression.
+
+    Args:
+    init (int): INIT word of the LUT.
+    operands (list): The expression of each literal word, ordered as the LUT literals.
+
+    Returns:
+    str: An expression over the operands and the all-ones word "ones", equivalent to evaluate_words.
+    """
+    invert, minterms = lut_minterms(init, len(operands))
+    terms = []
+    for minterm in minterms:
+        factors = [operand if polarity else f"(ones ^ {operand})" for polarity, operand in zip(minterm, operands)]
+        terms.append(' & '.join(factors) if factors else 'ones')
+    expression = ' | '.join(f"({term})" for term in terms) if terms else 'ones ^ ones'
+    return f"ones ^ ({expression})" if invert else expression
+
+def default_cache_dir():
+    """
+    Returns the per-user directory of the compiled netlist cache: $VIRTUAL_FPGA_CACHE when set, otherwise
+    a virtual_fpga folder in the user's cache directory (%LOCALAPPDATA% on Windows, $XDG_CACHE_HOME or
+    ~/.cache elsewhere).
+    """
+    path = os.environ.get('VIRTUAL_FPGA_CACHE')
+    if path:
+        return path
+    base = os.environ.get('LOCALAPPDATA') if os.name == 'nt' else os.environ.get('XDG_CACHE_HOME')
+    return os.path.join(base or os.path.join(os.path.expanduser('~'), '.cache'), 'virtual_fpga', 'netlist_cache')
+
+class CompiledNetlist:
+    """
+    Bit-parallel evaluator of a mapped netlist on packed NumPy uint64 words.
+
+    Calling it with an (inputs x words) array, rows ordered as inputs, returns the (outputs x words)
+    array of the output variables. It wraps a shared object built from generated C when a compiler is
+    available (native is True), and the compiled Python netlist function otherwise.
+    """
+    def __init__(self, inputs, outputs, function, native):
+        self.inputs = inputs
+        self.outputs = outputs
+        self.function = function
+        self.native = native
+
+    def __call__(self, words):
+        words = np.ascontiguousarray(words, dtype=np.uint64)
+        n_words = words.shape[1]
+        result = np.empty((len(self.outputs), n_words), dtype=np.uint64)
+        if self.native:
+            # The buffers are handed to C as they are, without copies
+            self.function(words.ctypes.data, result.ctypes.data, n_words)
+        else:
+            ones = np.full(n_words, np.iinfo(np.uint64).max, dtype=np.uint64)
+            for row, value in enumerate(self.function(ones, *words)):
+                result[row] = value
+        return result
+
+# Netlist evaluator of a simulation worker process, set once per worker by init_simulation_worker
+worker_netlist = None
+
+def init_simulation_worker(source, inputs, outputs):
+    """
+    Compiles the generated netlist source once in a worker process.
+    """
+    global worker_netlist
+    namespace = {}
+    exec(compile(source, '<netlist>', 'exec'), namespace)
+    worker_netlist = CompiledNetlist(inputs, outputs, namespace['netlist'], False)
+
+def simulate_shard(words):
+    """
+    Simulates one shard of packed input words in a worker process and returns the packed outputs.
+    """
+    return worker_netlist(words)
+
+class Schedule:
+    """
+    Levelized evaluation order of a LUT netlist, built once and reused by every simulation.
+
+    Attributes:
+    levels (list): LUT indices grouped by level; a LUT only reads primary inputs and LUTs of lower levels.
+    order (list): LUT indices in evaluation order (the levels concatenated).
+    inputs (list): Sorted primary inputs, i.e. the literals no LUT drives.
+    steps (list): One (index, output, literals, init, weights) tuple per LUT, in evaluation order.
+    version (int): The LUTBank version the schedule was built from.
+    """
+    def __init__(self, luts, levels, inputs):
+        self.luts = luts
+        self.version = luts.version
+        self.levels = levels
+        self.order = [i for level in levels for i in level]
+        self.inputs = inputs
+        self.steps = []
+        for i in self.order:
+            lut = luts[i]
+            literals = tuple(lut.literals)
+            self.steps.append((i, lut.output, literals, lut.init, address_weights(len(literals))))
+
+class EventSimulator:
+    """
+    Event-driven simulator for streaming stimuli.
+
+    Only the LUTs reading a net that changed are re-evaluated, in level order, so each LUT runs at most
+    once per step and a step that flips a few inputs costs work proportional to the affected logic.
+    """
+    def __init__(self, fpga, input_assignment=None):
+        self.fpga = fpga
+        schedule = fpga.levelize()
+        self.steps = {step[0]: step for step in schedule.steps}
+        self.level = {i: depth for depth, level in enumerate(schedule.levels) for i in level}
+        self.readers = fpga.net_readers()
+        self.inputs = schedule.inputs
+        self.total_evaluations = 0
+        self.total_toggles = 0
+
+        # Settle the whole design once for the initial vector (all zeros by default)
+        if input_assignment is None:
+            input_assignment = {name: 0 for name in self.inputs}
+        self.values = fpga.resolve_inputs(input_assignment, self.inputs)
+        for i in schedule.order:
+            self.values[self.steps[i][1]] = self.evaluate(i)
+
+    def evaluate(self, i):
+        """
+        Evaluates LUT i on the current net values.
+        """
+        _, output, literals, init, weights = self.steps[i]
+        address = 0
+        for weight, lit in zip(weights, literals):
+            if self.values[lit]:
+                address += weight
+        return init >> address & 1
+
+    def step(self, changes):
+        """
+        Applies new input values and propagates them until the design is quiescent.
+
+        Args:
+        changes (dict): New values for some (or all) primary inputs; inverted names such as "a_" are accepted.
+
+        Returns:
+        dict: The activity of the step: the number of LUT evaluations and the nets that toggled.
+        """
+        queue = []
+        queued = set()
+        toggled = []
+
+        def schedule_readers(net):
+            for j in self.readers.get(net, ()):
+                if j not in queued:
+                    queued.add(j)
+                    heapq.heappush(queue, (self.level[j], j))
+
+        for name, value in changes.items():
+            if name not in self.values and name.endswith("_"):
+                name, value = name[:-1], not value
+            if name not in self.inputs:
+                raise Exception(f"{name} is not a primary input")
+            value = 1 if value else 0
+            if self.values[name] != value:
+                self.values[name] = value
+                toggled.append(name)
+                schedule_readers(name)
+
+        evaluations = 0
+        while queue:
+            _, i = heapq.heappop(queue)
+            evaluations += 1
+            output = self.steps[i][1]
+            value = self.evaluate(i)
+            if self.values[output] != value:
+                self.values[output] = value
+                toggled.append(output)
+                schedule_readers(output)
+
+        self.total_evaluations += evaluations
+        self.total_toggles += len(toggled)
+        return {"evaluations": evaluations, "toggled": toggled}
+
+    def outputs(self):
+        """
+        Returns the current value of every output variable.
+        """
+        return {var: self.values[var] for var in sorted(self.fpga.output_vars) if var in self.values}
+
+    def run(self, stimuli):
+        """
+        Simulates a stream of input vectors.
+
+        Yields:
+        tuple: The output values and the activity of each step.
+        """
+        for changes in stimuli:
+            activity = self.step(changes)
+            yield self.outputs(), activity
+
+class ComponentSchedule:
+    """
+    Strongly connected components of a LUT netlist, in topological order.
+
+    Attributes:
+    components (list): Lists of LUT indices; every component only reads primary inputs and earlier components.
+    loops (list): The components that form combinational loops (more than one LUT, or a LUT reading itself).
+    inputs (list): Sorted primary inputs, i.e. the literals no LUT drives.
+    steps (dict): One (index, output, literals, init, weights) tuple per LUT index.
+    version (int): The LUTBank version the components were built from.
+    """
+    def __init__(self, luts, components, loops, inputs):
+        self.luts = luts
+        self.version = luts.version
+        self.components = components
+        self.loops = loops
+        self.inputs = inputs
+        self.steps = {}
+        for i, lut in enumerate(luts):
+            literals = tuple(lut.literals)
+            self.steps[i] = (i, lut.output, literals, lut.init, address_weights(len(literals)))
+
+class VCDWriter:
+    """
+    Streams a Value Change Dump (VCD) waveform of chosen nets.
+
+    Only the nets whose value changed are written at each time step, and records are collected in a
+    buffer that is written to the file in large blocks, so dumping long runs stays cheap.
+    Use it as a monitor of VirFGPA.simulate_cycles, which calls sample() once per cycle.
+    """
+    def __init__(self, path, signals, timescale='1ns', lane=0, buffer_size=1 << 16):
+        """
+        Args:
+        path (str): Path of the VCD file.
+        signals (list): The nets to dump, by their names in LUTs_list (inputs, outputs or Int nets).
+        timescale (str): Duration of one time unit (one clock cycle).
+        lane (int): The bit of word values to record in bit-parallel runs.
+        buffer_size (int): Number of records buffered before they are written to the file.
+        """
+        self.signals = list(dict.fromkeys(signals))
+        self.lane = lane
+        self.buffer_size = buffer_size
+        self.codes = {name: self.identifier(i) for i, name in enumerate(self.signals)}
+        self.last = {}
+        self.buffer = []
+        self.file = open(path, 'w')
+        self.file.write("$version Virtual FPGA $end\n")
+        self.file.write(f"$timescale {timescale} $end\n")
+        self.file.write("$scope module top $end\n")
+        for name in self.signals:
+            self.file.write(f"$var wire 1 {self.codes[name]} {name} $end\n")
+        self.file.write("$upscope $end\n$enddefinitions $end\n")
+
+    @staticmethod
+    def identifier(i):
+        """
+        Returns the short VCD identifier code of signal i (printable characters ! to ~).
+        """
+        code = chr(33 + i % 94)
+        while i >= 94:
+            i = i // 94 - 1
+            code += chr(33 + i % 94)
+        return code
+
+    def sample(self, time, values):
+        """
+        Records the nets that changed since the previous sample.
+
+        Args:
+        time (int): The simulation time (the cycle number).
+        values (dict): The value of every dumped net.
+        """
+        changes = []
+        last = self.last
+        lane = self.lane
+        for name, code in self.codes.items():
+            value = values[name] >> lane & 1
+            if last.get(name) != value:
+                last[name] = value
+                changes.append(f"{value}{code}")
+        if changes:
+            self.buffer.append(f"#{time}")
+            self.buffer.extend(changes)
+            if len(self.buffer) >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered records to the file.
+        """
+        if self.buffer:
+            self.buffer.append("")
+            self.file.write("\n".join(self.buffer))
+            self.buffer = []
+
+    def close(self, time=None):
+        """
+        Flushes the buffer and closes the file, optionally marking the end time of the run.
+        """
+        if time is not None:
+            self.buffer.append(f"#{time}")
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class LogicAnalyzer:
+    """
+    Embedded logic analyzer: captures a window of samples of a few nets around trigger events.
+
+    Only the watched nets are sampled, into a fixed-size ring buffer holding the latest pre-trigger samples.
+    When the trigger condition holds, the buffer is frozen and filled with the post-trigger samples, and the
+    window is stored as a capture. Use it as a monitor of VirFGPA.simulate_cycles, which calls sample()
+    once per cycle.
+    """
+    def __init__(self, signals, trigger, depth=64, pre_trigger=32, max_captures=1, lane=0):
+        """
+        Args:
+        signals (list): The nets to watch, by their names in LUTs_list; trigger nets are watched too.
+        trigger (dict): Maps nets to a condition, all of which must hold in the same cycle: 0 or 1 (level),
+        'R' (rising edge), 'F' (falling edge) or 'B' (either edge).
+        depth (int): Number of samples in each capture.
+        pre_trigger (int): Number of samples kept before the trigger sample.
+        max_captures (int): Number of captures after which the analyzer stops (done becomes True).
+        lane (int): The bit of word values to sample in bit-parallel runs.
+        """
+        if not 0 <= pre_trigger < depth:
+            raise Exception("pre_trigger must be smaller than the capture depth")
+        self.signals = list(dict.fromkeys(list(signals) + list(trigger)))
+        self.conditions = []
+        for net, condition in trigger.items():
+            if condition not in (0, 1, 'R', 'F', 'B'):
+                raise Exception(f"Unknown trigger condition for {net}: {condition}")
+            self.conditions.append((self.signals.index(net), condition))
+        self.depth = depth
+        self.pre_trigger = pre_trigger
+        self.max_captures = max_captures
+        self.lane = lane
+        self.buffer = deque(maxlen=pre_trigger)
+        self.window = None
+        self.previous = None
+        self.captures = []
+        self.done = False
+
+    def triggered(self, sample):
+        """
+        Tells whether the trigger condition holds for a sample, given the previous one.
+        """
+        previous = self.previous
+        for index, condition in self.conditions:
+            value = sample[index]
+            if condition == 0 or condition == 1:
+                if value != condition:
+                    return False
+            elif previous is None or previous[index] == value:
+                return False
+            elif condition == 'R' and not value or condition == 'F' and value:
+                return False
+        return True
+
+    def sample(self, time, values):
+        """
+        Samples the watched nets, and arms or fills a capture.
+
+        Args:
+        time (int): The simulation time (the cycle number).
+        values (dict): The value of every watched net.
+        """
+        if self.done:
+            return
+        lane = self.lane
+        sample = tuple(values[name] >> lane & 1 for name in self.signals)
+        if self.window is not None:
+            self.window["samples"].append((time, sample))
+            if len(self.window["samples"]) == self.depth:
+                self.store()
+        elif self.triggered(sample):
+            samples = list(self.buffer)
+            samples.append((time, sample))
+            self.window = {"trigger": time, "samples": samples}
+            if self.pre_trigger + 1 == self.depth:
+                self.store()
+        else:
+            self.buffer.append((time, sample))
+        self.previous = sample
+
+    def store(self):
+        """
+        Stores the current window as a capture and re-arms the trigger.
+        """
+        self.captures.append(self.window)
+        self.window = None
+        self.buffer.clear()
+        self.done = len(self.captures) >= self.max_captures
+
+    def finish(self):
+        """
+        Stores a capture whose post-trigger samples were cut short by the end of the run.
+        """
+        if self.window is not None:
+            self.store()
+
+    def dump(self, capture, path=None):
+        """
+        Prints a capture as a table, one row per sample with the trigger row marked, or writes it to a file.
+        """
+        width = max(len(name) for name in self.signals)
+        lines = [f"Trigger at cycle {capture['trigger']}"]
+        lines.append(" " * 10 + " ".join(name.rjust(width) for name in self.signals))
+        for time, sample in capture["samples"]:
+            mark = "T" if time == capture["trigger"] else " "
+            lines.append(f"{mark}{time:>8} " + " ".join(str(value).rjust(width) for value in sample))
+        if path is None:
+            print("\n".join(lines))
+        else:
+            with open(path, 'w') as file:
+                file.write("\n".join(lines) + "\n")
+
+    def dump_vcd(self, capture, path, timescale='1ns'):
+        """
+        Writes a capture as a VCD waveform.
+        """
+        writer = VCDWriter(path, self.signals, timescale)
+        for time, sample in capture["samples"]:
+            writer.sample(time, dict(zip(self.signals, sample)))
+        writer.close(capture["samples"][-1][0] + 1)
+
+class FaultSimulator:
+    """
+    Parallel-pattern stuck-at fault simulator.
+
+    A fault is a (LUT index, net, value) tuple: the input pin of the LUT reading net, or the LUT output when
+    net is the output of the LUT, stuck at value 0 or 1. The design is simulated fault free once per block
+    of patterns, then every remaining fault is injected and propagated event-driven through its fan-out
+    cone only; a fault is dropped as soon as some pattern shows a difference at an observed net.
+
+    Flip-flops are assumed to be scanned: their outputs are controllable like primary inputs and their
+    D nets are observed like output variables.
+    """
+    def __init__(self, fpga):
+        self.fpga = fpga
+        schedule = fpga.levelize()
+        self.steps = {step[0]: step for step in schedule.steps}
+        position = {i: position for position, i in enumerate(schedule.order)}
+        # Readers of every net as (position in the schedule, LUT index), ready for the event queue
+        self.readers = {net: [(position[i], i) for i in readers] for net, readers in fpga.net_readers().items()}
+        self.inputs = schedule.inputs
+        self.observed = set(fpga.output_vars) | {ff["d"] for ff in fpga.flip_flops}
+
+    def faults(self):
+        """
+        Enumerates the stuck-at-0 and stuck-at-1 faults of every LUT input pin and output.
+        """
+        faults = []
+        for i in sorted(self.steps):
+            _, output, literals, _, _ = self.steps[i]
+            for net in literals + (output,):
+                faults.append((i, net, 0))
+                faults.append((i, net, 1))
+        return faults
+
+    def collapse(self, faults):
+        """
+        Groups equivalent faults, so that only one fault per group has to be simulated.
+
+        A pin fault is equivalent to an output fault of the same LUT when fixing the pin makes the LUT
+        constant, and to the output fault of the driving LUT when the net has no other reader and is not
+        observed.
+
+        Returns:
+        dict: Maps each representative fault to the faults of its group, in their original order.
+        """
+        drivers = self.fpga.net_drivers()
+        groups = {}
+        for fault in faults:
+            i, net, value = fault
+            _, output, literals, init, _ = self.steps[i]
+            representative = fault
+            if net != output:
+                k = len(literals)
+                cofactor = tt_cofactor(init, k, literals.index(net), value)
+                if cofactor == 0:
+                    representative = (i, output, 0)
+                elif cofactor == (1 << (1 << k - 1)) - 1:
+                    representative = (i, output, 1)
+                elif net in drivers and len(self.readers[net]) == 1 and net not in self.observed:
+                    representative = (drivers[net], net, value)
+            groups.setdefault(representative, []).append(fault)
+        return groups
+
+    def good_values(self, input_words, ones):
+        """
+        Simulates the fault-free design on bit-parallel input words.
+        """
+        values = self.fpga.resolve_inputs(input_words, self.inputs, ones)
+        return self.fpga.propagate_words(values, ones)
+
+    def detect(self, fault, good, ones):
+        """
+        Propagates one fault through its fan-out cone.
+
+        Args:
+        fault (tuple): The (LUT index, net, value) fault.
+        good (dict): The fault-free word of every net.
+        ones: The all-ones word.
+
+        Returns:
+        The word of the patterns that detect the fault (0 when none does).
+        """
+        i, net, value = fault
+        stuck = ones if value else 0
+        _, output, literals, init, _ = self.steps[i]
+        if net == output:
+            faulty_output = stuck
+        else:
+            faulty_output = evaluate_words(init, [stuck if lit == net else good[lit] for lit in literals], ones)
+        if faulty_output == good[output]:
+            return 0
+
+        faulty = {output: faulty_output}
+        queue = list(self.readers.get(output, ()))
+        heapq.heapify(queue)
+        queued = set(queue)
+        while queue:
+            entry = heapq.heappop(queue)
+            _, out, literals, init, _ = self.steps[entry[1]]
+            word = evaluate_words(init, [faulty[lit] if lit in faulty else good[lit] for lit in literals], ones)
+            if word != good[out]:
+                faulty[out] = word
+                for reader in self.readers.get(out, ()):
+                    if reader not in queued:
+                        queued.add(reader)
+                        heapq.heappush(queue, reader)
+
+        detected = 0
+        for out, word in faulty.items():
+            if out in self.observed:
+                detected |= word ^ good[out]
+        return detected
+
+    def run(self, input_words, n_vectors, faults=None, word_size=64):
+        """
+        Fault simulates a sequence of patterns with fault dropping.
+
+        Args:
+        input_words (dict): Maps every primary input to an int whose bit i is its value under pattern i.
+        n_vectors (int): Number of patterns packed in the words.
+        faults (list): The faults to simulate; defaults to every fault of faults().
+        word_size (int): Number of patterns simulated at once (64 or more).
+
+        Returns:
+        dict: detected (maps each detected fault to the first pattern detecting it), undetected (the
+        remaining faults, in order), total and coverage (the fraction of faults detected).
+        """
+        faults = self.faults() if faults is None else list(faults)
+        groups = self.collapse(faults)
+        remaining = list(groups)
+        detected = {}
+        for start in range(0, n_vectors, word_size):
+            if not remaining:
+                break
+            width = min(word_size, n_vectors - start)
+            ones = (1 << width) - 1
+            block = {name: word >> start & ones for name, word in input_words.items()}
+            good = self.good_values(block, ones)
+            undetected = []
+            for representative in remaining:
+                word = self.detect(representative, good, ones)
+                if word:
+                    pattern = start + (word & -word).bit_length() - 1
+                    for fault in groups[representative]:
+                        detected[fault] = pattern
+                else:
+                    undetected.append(representative)
+            remaining = undetected
+        undetected = set()
+        for representative in remaining:
+            undetected.update(groups[representative])
+        return {
+            "detected": detected,
+            "undetected": [fault for fault in faults if fault in undetected],
+            "total": len(faults),
+            "coverage": len(detected) / len(faults) if faults else 1.0
+        }
+
+class TestGenerator:
+    """
+    Automatic test pattern generation for the stuck-at faults of a LUT netlist.
+
+    Random patterns first detect the easy faults. PODEM then targets each remaining fault: it assigns
+    one primary input at a time, chosen by backtracing an objective through the LUT truth tables, implies
+    the assignment in three-valued logic on the good and faulty designs, and backtracks on conflicts.
+    The test cubes it finds are merged when compatible, and reverse-order fault simulation finally drops
+    every pattern that detects no fault left undetected by the later ones.
+    """
+    def __init__(self, fpga, backtrack_limit=100, seed=None):
+        self.fpga = fpga
+        self.simulator = FaultSimulator(fpga)
+        self.steps = self.simulator.steps
+        self.inputs = self.simulator.inputs
+        self.drivers = fpga.net_drivers()
+        self.backtrack_limit = backtrack_limit
+        self.random = random.Random(seed)
+
+        # Three-valued values of every net with all primary inputs unknown, the starting point of PODEM
+        self.unknown = {name: None for name in self.inputs}
+        for _, output, literals, init, _ in fpga.levelize().steps:
+            self.unknown[output] = evaluate_ternary(init, [self.unknown[lit] for lit in literals])
+
+    def pack(self, patterns):
+        """
+        Packs a list of patterns (dicts of primary input values) into one word per primary input.
+        """
+        words = {name: 0 for name in self.inputs}
+        for i, pattern in enumerate(patterns):
+            for name in self.inputs:
+                if pattern[name]:
+                    words[name] |= 1 << i
+        return words
+
+    def fill(self, cube):
+        """
+        Turns a test cube into a pattern, giving random values to its unspecified inputs.
+        """
+        return {name: cube[name] if name in cube else self.random.getrandbits(1) for name in self.inputs}
+
+    def random_phase(self, faults, max_patterns=4096, word_size=64):
+        """
+        Fault simulates blocks of random patterns until a block detects no new fault.
+
+        Returns:
+        tuple: The patterns that first detected some fault, and the faults still undetected.
+        """
+        patterns = []
+        remaining = list(faults)
+        for _ in range(0, max_patterns, word_size):
+            if not remaining:
+                break
+            block = [self.fill({}) for _ in range(word_size)]
+            result = self.simulator.run(self.pack(block), word_size, remaining, word_size)
+            if not result["detected"]:
+                break
+            patterns.extend(block[i] for i in sorted(set(result["detected"].values())))
+            remaining = result["undetected"]
+        return patterns, remaining
+
+    def imply(self, fault, cone, good, faulty, nets):
+        """
+        Updates the three-valued good and faulty values after some primary inputs changed, event-driven:
+        only the LUTs reading a net whose value changed are evaluated again.
+
+        Args:
+        fault (tuple): The (LUT index, net, value) fault.
+        cone (set): The LUTs in the fan-out cone of the fault, the only ones whose faulty values differ.
+        good (dict): The good value (0, 1 or None) of every net, updated in place.
+        faulty (dict): The faulty value of every net driven by the cone, updated in place.
+        nets (list): The primary inputs that changed.
+        """
+        i, net, value = fault
+        readers = self.simulator.readers
+        queue = [reader for name in nets for reader in readers.get(name, ())]
+        heapq.heapify(queue)
+        queued = set(queue)
+        while queue:
+            entry = heapq.heappop(queue)
+            j = entry[1]
+            _, output, literals, init, _ = self.steps[j]
+            changed = False
+            word = evaluate_ternary(init, [good[lit] for lit in literals])
+            if word != good[output]:
+                good[output] = word
+                changed = True
+            if j in cone:
+                if j == i and net == output:
+                    word = value
+                else:
+                    operands = [faulty[lit] if lit in faulty else good[lit] for lit in literals]
+                    if j == i:
+                        operands[literals.index(net)] = value
+                    word = evaluate_ternary(init, operands)
+                if word != faulty[output]:
+                    faulty[output] = word
+                    changed = True
+            if changed:
+                for reader in readers.get(output, ()):
+                    if reader not in queued:
+                        queued.add(reader)
+                        heapq.heappush(queue, reader)
+
+    def objective(self, fault, cone, good, faulty):
+        """
+        Chooses the next (net, value) to set: activating the fault, or driving it through the D-frontier.
+        cone lists the steps of the LUTs in the fan-out cone of the fault, in schedule order.
+
+        Returns:
+        True when the fault is detected, None when it can no longer be detected, (net, value) otherwise.
+        """
+        i, net, value = fault
+        for out, word in faulty.items():
+            if out in self.simulator.observed and word is not None and good[out] is not None and word != good[out]:
+                return True
+        if good[net] is None:
+            return net, 1 - value
+        if good[net] == value:
+            return None
+
+        # The D-frontier: LUTs with a fault effect on an input and an unknown output, in schedule order
+        frontier = []
+        for j, output, literals, init, _ in cone:
+            if good[output] is not None and faulty[output] is not None:
+                continue
+            good_operands = [good[lit] for lit in literals]
+            faulty_operands = [faulty.get(lit, good[lit]) for lit in literals]
+            if j == i and net != output:
+                faulty_operands[literals.index(net)] = value
+            if any(g is not None and f is not None and g != f for g, f in zip(good_operands, faulty_operands)):
+                frontier.append((output, literals, init, good_operands, faulty_operands))
+        if not frontier or not self.x_path([entry[0] for entry in frontier], good, faulty):
+            return None
+
+        for output, literals, init, good_operands, faulty_operands in frontier:
+            candidates = [x for x, g in enumerate(good_operands) if g is None]
+            for x in candidates:
+                for w in (0, 1):
+                    g_try = good_operands[:x] + [w] + good_operands[x + 1:]
+                    f_try = faulty_operands[:x] + [w if faulty_operands[x] is None else faulty_operands[x]] \
+                        + faulty_operands[x + 1:]
+                    g_out = evaluate_ternary(init, g_try)
+                    f_out = evaluate_ternary(init, f_try)
+                    if g_out is None or f_out is None or g_out != f_out:
+                        return literals[x], w
+            if candidates:
+                return literals[candidates[0]], 0
+
+        # The D-frontier only waits on unknown faulty values: resolve the cone LUT they come from
+        for j, output, literals, _, _ in cone:
+            if faulty[output] is None:
+                for lit in literals:
+                    if good[lit] is None:
+                        return lit, 0
+        return None
+
+    def x_path(self, nets, good, faulty):
+        """
+        Tells whether a path of nets with an unknown good or faulty value leads from nets to an observed net.
+        Without one, the fault effect can no longer reach an output.
+        """
+        stack = list(nets)
+        seen = set(stack)
+        while stack:
+            name = stack.pop()
+            if name in self.simulator.observed:
+                return True
+            for _, j in self.simulator.readers.get(name, ()):
+                output = self.steps[j][1]
+                if output not in seen and (good[output] is None or faulty.get(output) is None):
+                    seen.add(output)
+                    stack.append(output)
+        return False
+
+    def backtrace(self, net, value, good):
+        """
+        Follows an objective back to an unassigned primary input, through the LUT input whose value
+        makes the desired output most likely.
+
+        Returns:
+        tuple: The primary input and the value to assign, or None when no input is left to assign.
+        """
+        while net in self.drivers:
+            _, _, literals, init, _ = self.simulator.steps[self.drivers[net]]
+            k = len(literals)
+            rows = (1 << (1 << k)) - 1
+            masks = column_masks(k)
+            care = rows
+            for mask, lit in zip(masks, literals):
+                if good[lit] is not None:
+                    care &= mask if good[lit] else rows ^ mask
+            target = init if value else rows ^ init
+            best = None
+            for mask, lit in zip(masks, literals):
+                if good[lit] is not None:
+                    continue
+                for w in (0, 1):
+                    rows_w = care & (mask if w else rows ^ mask)
+                    score = (target & rows_w).bit_count() / rows_w.bit_count()
+                    if best is None or score > best[0]:
+                        best = (score, lit, w)
+            if best is None:
+                return None
+            _, net, value = best
+        if good.get(net) is not None:
+            return None
+        return net, value
+
+    def podem(self, fault):
+        """
+        Searches for a test cube detecting one fault.
+
+        Returns:
+        tuple: The status ('detected', 'redundant' or 'aborted') and the test cube (a dict of the assigned
+        primary inputs) when one was found.
+        """
+        i, net, value = fault
+        cone = {i}
+        queue = [self.steps[i][1]]
+        while queue:
+            for _, j in self.simulator.readers.get(queue.pop(), ()):
+                if j not in cone:
+                    cone.add(j)
+                    queue.append(self.steps[j][1])
+        cone_steps = [step for step in self.fpga.levelize().steps if step[0] in cone]
+
+        # Start from all inputs unknown; the faulty design only differs inside the cone
+        good = dict(self.unknown)
+        faulty = {}
+        for j, output, literals, init, _ in cone_steps:
+            operands = [faulty[lit] if lit in faulty else good[lit] for lit in literals]
+            if j == i and net != output:
+                operands[literals.index(net)] = value
+            faulty[output] = value if j == i and net == output else evaluate_ternary(init, operands)
+
+        assignment = {}
+        decisions = []
+        backtracks = 0
+        while True:
+            target = self.objective(fault, cone_steps, good, faulty)
+            if target is True:
+                return 'detected', dict(assignment)
+            decision = None if target is None else self.backtrace(target[0], target[1], good)
+            if decision is not None:
+                assignment[decision[0]] = good[decision[0]] = decision[1]
+                decisions.append((decision[0], False))
+                self.imply(fault, cone, good, faulty, [decision[0]])
+                continue
+
+            # Conflict: flip the latest decision not tried both ways
+            changed = []
+            while decisions and decisions[-1][1]:
+                name = decisions.pop()[0]
+                del assignment[name]
+                good[name] = None
+                changed.append(name)
+            if not decisions:
+                return 'redundant', None
+            backtracks += 1
+            if backtracks > self.backtrack_limit:
+                return 'aborted', None
+            name = decisions.pop()[0]
+            assignment[name] = good[name] = 1 - assignment[name]
+            decisions.append((name, True))
+            changed.append(name)
+            self.imply(fault, cone, good, faulty, changed)
+
+    def deterministic_phase(self, faults):
+        """
+        Runs PODEM on each fault in turn, dropping the faults the (randomly filled) cubes found so far detect.
 
-        # Generate truth table by evaluating the expression for each combination of input values
-        for values in itertools.product(val, repeat=len(literals)):
-            context = dict(zip(literals, values))
-            # Adjust context for inverses (e.g., a' or a_)
-            for lit in literals:
-                context[lit + "_"] = not context[lit]  # Inverse logic
-                context[lit + "'"] = not context[lit]  # Alternative notation
-            output = eval(simple_expre, {}, context)
-            truth_dic[tuple(values)] = output
+        Returns:
+        tuple: The test cubes, their filled patterns, the redundant faults and the aborted faults.
+        """
+        cubes = []
+        patterns = []
+        redundant = []
+        aborted = []
+        remaining = list(faults)
+        while remaining:
+            fault = remaining.pop(0)
+            status, cube = self.podem(fault)
+            if status == 'redundant':
+                redundant.append(fault)
+            elif status == 'aborted':
+                aborted.append(fault)
+            else:
+                cubes.append(cube)
+                patterns.append(self.fill(cube))
+                if remaining:
+                    remaining = self.simulator.run(self.pack(patterns[-1:]), 1, remaining)["undetected"]
+        return cubes, patterns, redundant, aborted
+
+    @staticmethod
+    def merge_cubes(cubes):
+        """
+        Static compaction: merges every test cube into the first earlier cube it does not conflict with.
+        """
+        merged = []
+        for cube in cubes:
+            for target in merged:
+                if all(target.get(name, value) == value for name, value in cube.items()):
+                    target.update(cube)
+                    break
+            else:
+                merged.append(dict(cube))
+        return merged
+
+    def compact(self, patterns, faults):
+        """
+        Reverse-order fault simulation: keeps only the patterns that detect a fault no later pattern detects.
+        """
+        reverse = patterns[::-1]
+        result = self.simulator.run(self.pack(reverse), len(reverse), faults)
+        keep = sorted(set(result["detected"].values()), reverse=True)
+        return [reverse[i] for i in keep]
 
-        return truth_dic
+    def run(self, random_patterns=4096, faults=None):
+        """
+        Generates a compact test set.
 
+        Args:
+        random_patterns (int): Maximum number of random patterns tried before the deterministic phase.
+        faults (list): The faults to target; defaults to every fault of FaultSimulator.faults().
+
+        Returns:
+        dict: patterns (one dict of primary input values per pattern), detected (maps each detected fault
+        to its first pattern), redundant (faults proven untestable), aborted (faults given up after
+        backtrack_limit backtracks), total and coverage.
+        """
+        faults = self.simulator.faults() if faults is None else list(faults)
+        patterns, remaining = self.random_phase(faults, random_patterns)
+        cubes, _, redundant, aborted = self.deterministic_phase(remaining)
+
+        # Merged cubes get new random values, which may lose faults their separate fills detected by chance
+        patterns += [self.fill(cube) for cube in self.merge_cubes(cubes)]
+        untestable = set(redundant) | set(aborted)
+        testable = [fault for fault in faults if fault not in untestable]
+        lost = self.simulator.run(self.pack(patterns), len(patterns), testable)["undetected"]
+        _, filled, _, failed = self.deterministic_phase(lost)
+        patterns += filled
+        aborted += failed
+
+        patterns = self.compact(patterns, faults)
+        result = self.simulator.run(self.pack(patterns), len(patterns), faults)
+        return {
+            "patterns": patterns,
+            "detected": result["detected"],
+            "redundant": redundant,
+            "aborted": aborted,
+            "total": len(faults),
+            "coverage": result["coverage"]
+        }
 
 class VirFGPA:
 
-    def __init__(self, sop_dict={}, total_4_input_LUTs=100, total_6_input_LUTs=100):
+    def __init__(self, sop_dict={}, total_4_input_LUTs=100, total_6_input_LUTs=100, total_flip_flops=100,
+                 registered_outputs=()):
         self.sop_dict = sop_dict
-        self.LUTs_list = []
+        self.LUTs_list = LUTBank()
         self.connection = []
 
         self.input_vars = set()
         self.output_vars = set()
 
+        # Outputs of sop_dict that are latched by a D flip-flop on every clock
+        self.registered_outputs = set(registered_outputs)
+        self.flip_flops = []
+
         self.total_4_input_LUTs = total_4_input_LUTs
         self.total_6_input_LUTs = total_6_input_LUTs
+        self.total_flip_flops = total_flip_flops
 
         self.available_4_inputs_LUTs = total_4_input_LUTs
         self.available_6_inputs_LUTs = total_6_input_LUTs
+        self.available_flip_flops = total_flip_flops
+
+        self._schedule = None
+        self._components = None
+        self._compiled = None
+        self._native = None
 
 
     def map_sop_to_LUTs(self):
@@ -80,6 +2050,8 @@ class VirFGPA:
         Maps the given SOP expressions to LUTs.
         Decomposes complex expressions into smaller sub-expressions and creates LUTs accordingly.
         """
+        self._schedule = None
+        self._components = None
         intermediate_vars = count(1)
         generated_vars = set()
 
@@ -91,7 +2063,13 @@ class VirFGPA:
                 decomposed_terms = self.decompose_term(term, intermediate_vars)
                 all_combined_terms.append(decomposed_terms)
 
-            self.create_combined_lut(output_var, all_combined_terms, intermediate_vars)
+            if output_var in self.registered_outputs:
+                # The logic drives the D input of a flip-flop, whose Q output is the output variable
+                d_var = f"Int{next(intermediate_vars)}"
+                self.create_combined_lut(d_var, all_combined_terms, intermediate_vars)
+                self.create_flip_flop(d_var, output_var)
+            else:
+                self.create_combined_lut(output_var, all_combined_terms, intermediate_vars)
 
             # Identifying input variables
             for term in product_terms:
@@ -194,7 +2172,7 @@ class VirFGPA:
         # Create the final LUT that ORs the outputs of the combined LUTs
         final_expr = ' | '.join(final_terms)
 
-        if not any(lut.output == output_var for lut in self.LUTs_list):
+        if self.LUTs_list.driver(output_var) is None:
             unique_inputs = set(final_terms)
             if len(unique_inputs) <= 4:
                 self.available_4_inputs_LUTs -= 1
@@ -204,17 +2182,33 @@ class VirFGPA:
                 raise Exception("Term has too many unique inputs for available LUTs")
             LUT_inst = LUT(final_terms, output_var, f"{output_var} = {final_expr}")
             self.LUTs_list.append(LUT_inst)
+    def create_flip_flop(self, d_var, q_var):
+        """
+        Allocates a D flip-flop latching d_var into q_var on every clock.
+        """
+        if self.available_flip_flops <= 0:
+            raise Exception("Not enough flip-flops available")
+        self.available_flip_flops -= 1
+        self.flip_flops.append({"d": d_var, "q": q_var})
+
     def connect_LUT(self):
         """
         connect the LUTs according to the SOP dictionary
         """
+        # A LUT connects to every other LUT listing its output among its inputs; readers are gathered per
+        # net id in one pass over the bank instead of comparing every pair of LUTs
+        bank = self.LUTs_list
+        readers = {}
+        offsets, input_ids = bank.input_offsets, bank.input_ids
+        for j in range(len(bank)):
+            for net in set(input_ids[offsets[j]:offsets[j + 1]]):
+                readers.setdefault(net, []).append(j)
+
         self.connection = {}
-        for i, lut_a in enumerate(self.LUTs_list):
-            for j, lut_b in enumerate(self.LUTs_list):
-                if i != j and lut_a.output in lut_b.input:
-                    if i not in self.connection:
-                        self.connection[i] = []
-                    self.connection[i].append(j)
+        for i, net in enumerate(bank.output_ids):
+            connected = [j for j in readers.get(net, ()) if j != i]
+            if connected:
+                self.connection[i] = connected
         return self.connection
 
     def output_bitstream(self, binary=False):
@@ -228,10 +2222,13 @@ class VirFGPA:
             "connections": self.connection,
             "input_vars": list(self.input_vars),
             "output_vars": list(self.output_vars),
+            "flip_flops": self.flip_flops,
             "total_4_input_LUTs": self.total_4_input_LUTs,
             "total_6_input_LUTs": self.total_6_input_LUTs,
+            "total_flip_flops": self.total_flip_flops,
             "available_4_inputs_LUTs": self.available_4_inputs_LUTs,
-            "available_6_inputs_LUTs": self.available_6_inputs_LUTs
+            "available_6_inputs_LUTs": self.available_6_inputs_LUTs,
+            "available_flip_flops": self.available_flip_flops
         }
 
         # Convert to binary sequence if needed
@@ -260,7 +2257,9 @@ class VirFGPA:
             with open('bitstream.json', 'r') as file:
                 bitstream_data = json.load(file)
 
-        self.LUTs_list = [LUT(lut["inputs"], lut["output"], lut["function"]) for lut in bitstream_data["LUTs"]]
+        self.LUTs_list = LUTBank()
+        for lut in bitstream_data["LUTs"]:
+            self.LUTs_list.add(lut["inputs"], lut["output"], lut["function"])
         self.connection = bitstream_data["connections"]
         self.input_vars = set(bitstream_data["input_vars"])
         self.output_vars = set(bitstream_data["output_vars"])
@@ -268,9 +2267,931 @@ class VirFGPA:
         self.total_6_input_LUTs = bitstream_data["total_6_input_LUTs"]
         self.available_4_inputs_LUTs = bitstream_data["available_4_inputs_LUTs"]
         self.available_6_inputs_LUTs = bitstream_data["available_6_inputs_LUTs"]
+        # Bitstreams written before flip-flops were added have none
+        self.flip_flops = bitstream_data.get("flip_flops", [])
+        self.registered_outputs = {ff["q"] for ff in self.flip_flops}
+        self.total_flip_flops = bitstream_data.get("total_flip_flops", 0)
+        self.available_flip_flops = bitstream_data.get("available_flip_flops", self.total_flip_flops)
+        self._schedule = None
+        self._components = None
 
         return self.LUTs_list, self.connection
 
+    def build_truth_tables(self, backend='numpy'):
+        """
+        Computes the truth tables of every LUT in LUTs_list in one call.
+
+        Args:
+        backend (str): 'numpy' for the vectorized backend, 'int' for the bitwise integer programs.
+        """
+        if backend == 'numpy':
+            results = truth_tables_numpy([lut.logic for lut in self.LUTs_list])
+        elif backend == 'int':
+            results = [lut.logic_to_init(lut.logic) for lut in self.LUTs_list]
+        else:
+            raise Exception(f"Unknown truth table backend: {backend}")
+
+        for lut, (literals, init) in zip(self.LUTs_list, results):
+            lut.cache_truth_table(literals, init)
+        return self.LUTs_list
+
+    def group_npn_classes(self):
+        """
+        Groups the LUTs of LUTs_list by NPN class.
+
+        Returns:
+        dict: Maps (number of literals, canonical INIT word) to the indices of the LUTs in that class.
+        """
+        classes = {}
+        for i, lut in enumerate(self.LUTs_list):
+            classes.setdefault(lut.npn_key(), []).append(i)
+        return classes
+
+    def net_drivers(self):
+        """
+        Maps every net driven by a LUT to the index of its (first) driving LUT.
+        """
+        drivers = {}
+        for i, lut in enumerate(self.LUTs_list):
+            drivers.setdefault(lut.output, i)
+        return drivers
+
+    def net_readers(self):
+        """
+        Maps every net to the indices of the LUTs that read it.
+
+        This is the fan-out relation connect_LUT records between LUTs, kept per net and keyed by
+        literal, so LUTs reading an inverted net (e.g. "X_") are included.
+        """
+        readers = {}
+        for i, lut in enumerate(self.LUTs_list):
+            for lit in lut.literals:
+                readers.setdefault(lit, []).append(i)
+        return readers
+
+    def levelize(self):
+        """
+        Levelizes the LUT graph and caches the schedule until the LUTs change.
+
+        Returns:
+        Schedule: The evaluation order of the LUTs.
+        """
+        schedule = self._schedule
+        if schedule is not None and schedule.luts is self.LUTs_list and schedule.version == self.LUTs_list.version:
+            return schedule
+
+        drivers = self.net_drivers()
+        readers = {}
+        pending = []
+        inputs = set()
+        for i, lut in enumerate(self.LUTs_list):
+            fanin = set()
+            for lit in lut.literals:
+                if lit in drivers:
+                    fanin.add(drivers[lit])
+                else:
+                    inputs.add(lit)
+            for j in fanin:
+                readers.setdefault(j, []).append(i)
+            pending.append(len(fanin))
+
+        # Kahn's algorithm, one level at a time
+        levels = []
+        level = [i for i, count in enumerate(pending) if count == 0]
+        while level:
+            levels.append(level)
+            next_level = []
+            for i in level:
+                for j in readers.get(i, []):
+                    pending[j] -= 1
+                    if pending[j] == 0:
+                        next_level.append(j)
+            level = next_level
+
+        if sum(len(level) for level in levels) != len(self.LUTs_list):
+            looped = [self.LUTs_list[i].output for i, count in enumerate(pending) if count > 0]
+            raise Exception(f"Combinational loop, cannot order the LUTs driving: {', '.join(looped)} "
+                            "(see find_loops and simulate_loops)")
+
+        # Register outputs are sources of the combinational logic, even when no LUT reads them
+        inputs.update(ff["q"] for ff in self.flip_flops)
+        self._schedule = Schedule(self.LUTs_list, levels, sorted(inputs))
+        return self._schedule
+
+    def find_components(self):
+        """
+        Finds the strongly connected components of the LUT graph with Tarjan's algorithm (linear time)
+        and caches them until the LUTs change.
+
+        Returns:
+        ComponentSchedule: The components in topological order, and which of them are loops.
+        """
+        components = self._components
+        if (components is not None and components.luts is self.LUTs_list
+                and components.version == self.LUTs_list.version):
+            return components
+
+        readers = self.net_readers()
+        drivers = self.net_drivers()
+        inputs = sorted({net for net in readers if net not in drivers} | {ff["q"] for ff in self.flip_flops})
+        fanout = [readers.get(lut.output, []) for lut in self.LUTs_list]
+
+        # Iterative Tarjan, so deep netlists do not hit the recursion limit
+        index = [None] * len(fanout)
+        low = [0] * len(fanout)
+        on_stack = [False] * len(fanout)
+        stack = []
+        found = []
+        counter = 0
+        for root in range(len(fanout)):
+            if index[root] is not None:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, iter(fanout[root]))]
+            while work:
+                node, successors = work[-1]
+                for successor in successors:
+                    if index[successor] is None:
+                        index[successor] = low[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append((successor, iter(fanout[successor])))
+                        break
+                    if on_stack[successor]:
+                        low[node] = min(low[node], index[successor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            component.append(member)
+                            if member == node:
+                                break
+                        found.append(sorted(component))
+
+        # Tarjan emits components sinks first
+        found.reverse()
+        loops = [component for component in found
+                 if len(component) > 1 or component[0] in fanout[component[0]]]
+        self._components = ComponentSchedule(self.LUTs_list, found, loops, inputs)
+        return self._components
+
+    def find_loops(self):
+        """
+        Returns the combinational loops of the design, as lists of LUT indices.
+        """
+        return self.find_components().loops
+
+    def simulate_loops(self, input_assignment, max_iterations=64, initial=0):
+        """
+        Evaluates a design that may contain combinational loops, for one input vector.
+
+        The acyclic parts are evaluated once in topological order. Each loop is iterated on its own,
+        starting from initial, until its nets reach a fixed point, a previous state repeats
+        (oscillation) or max_iterations sweeps have run.
+
+        Returns:
+        tuple: The value of every output variable, and one report per loop that failed to settle,
+        with its LUT indices, its nets, its status ('oscillating' or 'unsettled') and the number of
+        sweeps run.
+        """
+        if max_iterations < 1:
+            raise Exception("max_iterations must be at least 1")
+        components = self.find_components()
+        values = self.resolve_inputs(input_assignment, components.inputs)
+        steps = components.steps
+        loops = set(map(tuple, components.loops))
+        unsettled = []
+
+        def evaluate(i):
+            _, output, literals, init, weights = steps[i]
+            address = 0
+            for weight, lit in zip(weights, literals):
+                if values[lit]:
+                    address += weight
+            values[output] = init >> address & 1
+
+        for component in components.components:
+            if tuple(component) not in loops:
+                evaluate(component[0])
+                continue
+
+            nets = [steps[i][1] for i in component]
+            for net in nets:
+                values[net] = initial
+            state = tuple(values[net] for net in nets)
+            seen = {state}
+            status = 'unsettled'
+            for iteration in range(1, max_iterations + 1):
+                for i in component:
+                    evaluate(i)
+                new_state = tuple(values[net] for net in nets)
+                if new_state == state:
+                    status = None
+                    break
+                if new_state in seen:
+                    status = 'oscillating'
+                    break
+                seen.add(new_state)
+                state = new_state
+            if status is not None:
+                unsettled.append({"luts": component, "nets": nets, "status": status, "iterations": iteration})
+
+        outputs = {var: values[var] for var in sorted(self.output_vars) if var in values}
+        return outputs, unsettled
+
+    def primary_inputs(self):
+        """
+        Returns the sorted nets a simulation needs values for.
+        Flip-flop outputs are included: combinational simulations take the register state as inputs.
+        """
+        return self.find_components().inputs
+
+    def external_inputs(self):
+        """
+        Returns the sorted primary inputs that are not flip-flop outputs.
+        """
+        registers = {ff["q"] for ff in self.flip_flops}
+        return [net for net in self.primary_inputs() if net not in registers]
+
+    def simulate_cycles(self, stimuli, state=None, ones=1, cache_dir=None, monitors=()):
+        """
+        Cycle-based simulation of a design with flip-flops.
+
+        Every clock cycle evaluates the combinational logic once, with the compiled netlist function,
+        then latches every flip-flop. Registers break the feedback loops of the design, so only the
+        combinational part has to be loop free.
+
+        Args:
+        stimuli (iterable): One dict of external input values per cycle (0/1, or words when ones is the
+        all-ones word, to run independent sequences bit-parallel).
+        state (dict): Register values (flip-flop outputs); missing ones start at 0. Updated in place
+        at every clock.
+        ones: The all-ones value.
+        monitors (list): Objects with a signals list and a sample(cycle, values) method (e.g. VCDWriter),
+        called every cycle with the value of their signals before the clock edge.
+
+        Yields:
+        dict: The value of every output variable in each cycle, before the clock edge.
+        """
+        schedule = self.levelize()
+        outputs = sorted(self.output_vars)
+        d_nets = [ff["d"] for ff in self.flip_flops]
+        drivers = self.net_drivers()
+        watched = []
+        for monitor in monitors:
+            for net in monitor.signals:
+                if net not in drivers and net not in schedule.inputs:
+                    raise Exception(f"Unknown net: {net}")
+                if net in drivers and net not in watched:
+                    watched.append(net)
+        returned = outputs + d_nets + watched
+        netlist = self.compile_python(cache_dir, returned)
+        external = self.external_inputs()
+        state = state if state is not None else {}
+        for ff in self.flip_flops:
+            state.setdefault(ff["q"], 0)
+
+        for cycle, cycle_inputs in enumerate(stimuli):
+            values = self.resolve_inputs(cycle_inputs, external, ones)
+            values.update(state)
+            results = netlist(ones, *(values[net] for net in schedule.inputs))
+            if monitors:
+                values.update(zip(returned, results))
+                for monitor in monitors:
+                    monitor.sample(cycle, values)
+            for ff, value in zip(self.flip_flops, results[len(outputs):]):
+                state[ff["q"]] = value
+            yield dict(zip(outputs, results))
+
+    def dump_vcd(self, stimuli, path, signals=None, state=None, ones=1, lane=0, timescale='1ns',
+                 cache_dir=None):
+        """
+        Runs a cycle-based simulation and dumps a VCD waveform of the chosen nets.
+
+        Args:
+        stimuli (iterable): One dict of external input values per cycle, as for simulate_cycles.
+        path (str): Path of the VCD file.
+        signals (list): The nets to dump; defaults to the primary inputs and the output variables.
+        Any Int net of LUTs_list may be added, under the same name as in display_all_info.
+        state (dict): Initial register values, updated in place.
+        ones: The all-ones value (the all-ones word for bit-parallel stimuli).
+        lane (int): The bit of word values to record in bit-parallel runs.
+        timescale (str): Duration of one clock cycle.
+
+        Returns:
+        int: The number of cycles simulated.
+        """
+        if signals is None:
+            signals = list(self.primary_inputs())
+            signals += [var for var in sorted(self.output_vars) if var not in signals]
+        writer = VCDWriter(path, signals, timescale, lane)
+        cycles = 0
+        try:
+            for _ in self.simulate_cycles(stimuli, state, ones, cache_dir, [writer]):
+                cycles += 1
+        finally:
+            writer.close(cycles)
+        return cycles
+
+    def logic_analyzer(self, stimuli, signals, trigger, depth=64, pre_trigger=32, max_captures=1, state=None,
+                       ones=1, lane=0, cache_dir=None):
+        """
+        Runs a cycle-based simulation with a LogicAnalyzer watching some nets, until it has made its
+        captures or the stimuli end.
+
+        Args:
+        stimuli (iterable): One dict of external input values per cycle, as for simulate_cycles.
+        signals (list): The nets to watch (inputs, outputs or Int nets of LUTs_list).
+        trigger (dict): The trigger condition of each trigger net: 0, 1, 'R', 'F' or 'B'.
+        depth (int): Number of samples in each capture.
+        pre_trigger (int): Number of samples kept before the trigger sample.
+        max_captures (int): Number of captures to make.
+        state (dict): Initial register values, updated in place.
+        ones: The all-ones value (the all-ones word for bit-parallel stimuli).
+        lane (int): The bit of word values to sample in bit-parallel runs.
+
+        Returns:
+        LogicAnalyzer: The analyzer, holding the captures.
+        """
+        analyzer = LogicAnalyzer(signals, trigger, depth, pre_trigger, max_captures, lane)
+        for _ in self.simulate_cycles(stimuli, state, ones, cache_dir, [analyzer]):
+            if analyzer.done:
+                break
+        analyzer.finish()
+        return analyzer
+
+    def resolve_inputs(self, input_assignment, inputs, ones=1):
+        """
+        Reads the value of every primary input from an assignment.
+        An inverted name such as "a_" may be given instead of "a".
+
+        Args:
+        input_assignment (dict): Maps nets to values (0/1 for one vector, words for bit-parallel runs).
+        inputs (list): The nets to read.
+        ones: The all-ones value of the simulation (1, or the all-ones word).
+        """
+        values = {}
+        for name in inputs:
+            if name in input_assignment:
+                values[name] = input_assignment[name] & ones
+            elif name + "_" in input_assignment:
+                values[name] = ones ^ (input_assignment[name + "_"] & ones)
+            else:
+                raise Exception(f"No value given for input {name}")
+        return values
+
+    def simulate(self, input_assignment):
+        """
+        Evaluates the mapped design for one input vector.
+
+        Args:
+        input_assignment (dict): Maps every primary input to 0/1 (or False/True).
+
+        Returns:
+        dict: The value of every output variable.
+        """
+        schedule = self.levelize()
+        values = self.resolve_inputs(input_assignment, schedule.inputs)
+        for _, output, literals, init, weights in schedule.steps:
+            address = 0
+            for weight, lit in zip(weights, literals):
+                if values[lit]:
+                    address += weight
+            values[output] = init >> address & 1
+        return {var: values[var] for var in sorted(self.output_vars) if var in values}
+
+    def propagate_words(self, values, ones):
+        """
+        Evaluates every LUT in level order on bit-parallel words.
+
+        Args:
+        values (dict): Words of the primary inputs; the words of all LUT outputs are added in place.
+        ones: The all-ones word.
+        """
+        for _, output, literals, init, _ in self.levelize().steps:
+            values[output] = evaluate_words(init, [values[lit] for lit in literals], ones)
+        return values
+
+    def simulate_words(self, input_words, n_vectors):
+        """
+        Simulates many test vectors at once, with one Python int per net.
+
+        Args:
+        input_words (dict): Maps every primary input to an int whose bit i is its value under vector i.
+        n_vectors (int): Number of test vectors packed in the words.
+
+        Returns:
+        dict: The word of every output variable.
+        """
+        ones = (1 << n_vectors) - 1
+        values = self.resolve_inputs(input_words, self.primary_inputs(), ones)
+        self.propagate_words(values, ones)
+        return {var: values[var] for var in sorted(self.output_vars) if var in values}
+
+    def simulate_vectors(self, vectors):
+        """
+        Simulates a list of input assignments bit-parallel.
+
+        Args:
+        vectors (list): One dict per test vector, as taken by simulate.
+
+        Returns:
+        list: One dict of output values per test vector.
+        """
+        words = {}
+        for i, vector in enumerate(vectors):
+            for name, value in vector.items():
+                if value:
+                    words[name] = words.get(name, 0) | 1 << i
+                else:
+                    words.setdefault(name, 0)
+        outputs = self.simulate_words(words, len(vectors))
+        return [{var: word >> i & 1 for var, word in outputs.items()} for i in range(len(vectors))]
+
+    def simulate_faults(self, input_words, n_vectors, faults=None, word_size=64):
+        """
+        Stuck-at fault simulation of the mapped design (see FaultSimulator).
+
+        Args:
+        input_words (dict): Maps every primary input to an int whose bit i is its value under pattern i.
+        n_vectors (int): Number of patterns packed in the words.
+        faults (list): (LUT index, net, value) faults to simulate; defaults to every LUT input and output
+        stuck at 0 and at 1.
+        word_size (int): Number of patterns simulated at once.
+
+        Returns:
+        dict: The detected faults with their first detecting pattern, the undetected faults and the coverage.
+        """
+        return FaultSimulator(self).run(input_words, n_vectors, faults, word_size)
+
+    def generate_tests(self, random_patterns=4096, backtrack_limit=100, seed=None):
+        """
+        Generates a compact stuck-at test set for the mapped design (see TestGenerator).
+
+        Args:
+        random_patterns (int): Maximum number of random patterns tried before PODEM takes over.
+        backtrack_limit (int): Number of backtracks after which PODEM gives up on a fault.
+        seed: Seed of the random patterns and of the random filling of test cubes.
+
+        Returns:
+        dict: The patterns (one dict of primary input values each), the detected, redundant and aborted
+        faults, and the coverage. It can be passed to display_fault_coverage.
+        """
+        return TestGenerator(self, backtrack_limit, seed).run(random_patterns)
+
+    def display_fault_coverage(self, result):
+        """
+        Prints the fault coverage of a simulate_faults or generate_tests result and the faults left undetected.
+        """
+        print(f"Fault coverage: {len(result['detected'])}/{result['total']} ({result['coverage'] * 100:.2f}%)")
+        if "patterns" in result:
+            print(f"Test patterns: {len(result['patterns'])}")
+            undetected = [("Redundant", fault) for fault in result["redundant"]] + \
+                         [("Aborted", fault) for fault in result["aborted"]]
+        else:
+            undetected = [("Undetected", fault) for fault in result["undetected"]]
+        for label, (i, net, value) in undetected:
+            pin = "output" if net == self.LUTs_list[i].output else f"input {net}"
+            print(f"{label}: LUT {i} ({self.LUTs_list[i].output}) {pin} stuck-at-{value}")
+
+    def switching_activity(self, input_words, n_vectors):
+        """
+        Counts the toggles of every net over a sequence of test vectors, simulated bit-parallel.
+
+        Args:
+        input_words (dict): Maps every primary input to an int whose bit i is its value under vector i,
+        the vectors being applied in order.
+        n_vectors (int): Number of test vectors packed in the words.
+
+        Returns:
+        dict: The number of toggles of every primary input and LUT output.
+        """
+        ones = (1 << n_vectors) - 1
+        values = self.resolve_inputs(input_words, self.primary_inputs(), ones)
+        self.propagate_words(values, ones)
+        return {net: count_toggles(word, n_vectors) for net, word in values.items()}
+
+    def activity_report(self, input_words, n_vectors):
+        """
+        Reports the switching activity of every LUT in LUTs_list.
+
+        Args:
+        input_words (dict): Maps every primary input to its word, as for switching_activity.
+        n_vectors (int): Number of test vectors packed in the words.
+
+        Returns:
+        list: One dict per LUT with its id, output, type (4 or 6 inputs), fanout (the number of LUTs
+        reading its output), toggles and activity (toggles per vector transition).
+        """
+        toggles = self.switching_activity(input_words, n_vectors)
+        transitions = max(n_vectors - 1, 1)
+        readers = self.net_readers()
+        report = []
+        for i, lut in enumerate(self.LUTs_list):
+            report.append({
+                "id": i,
+                "output": lut.output,
+                "type": 4 if len(set(lut.input)) <= 4 else 6,
+                "fanout": len(readers.get(lut.output, ())),
+                "toggles": toggles[lut.output],
+                "activity": toggles[lut.output] / transitions
+            })
+        return report
+
+    @staticmethod
+    def estimate_dynamic_power(report, lut_capacitance=None, wire_capacitance=0.5, voltage=1.0, frequency=1.0):
+        """
+        Estimates the dynamic power of the design, 0.5 * C * V^2 * f summed over the LUT outputs weighted
+        by their activity.
+
+        The capacitance switched by a LUT output is that of its LUT type plus one wire per LUT it drives.
+        The default values are relative units, meant to compare alternative mappings of the same design.
+
+        Args:
+        report (list): The output of activity_report.
+        lut_capacitance (dict): The output capacitance of 4- and 6-input LUTs; defaults to {4: 1.0, 6: 1.5}.
+        wire_capacitance (float): The capacitance added by each fanout connection.
+        voltage (float): The supply voltage.
+        frequency (float): The vector (clock) frequency.
+
+        Returns:
+        float: The estimated dynamic power.
+        """
+        if lut_capacitance is None:
+            lut_capacitance = {4: 1.0, 6: 1.5}
+        power = 0.0
+        for entry in report:
+            capacitance = lut_capacitance[entry["type"]] + wire_capacitance * entry["fanout"]
+            power += 0.5 * entry["activity"] * capacitance * voltage ** 2 * frequency
+        return power
+
+    def pack_inputs(self, vectors, inputs=None):
+        """
+        Packs a (vectors x inputs) 0/1 array into (primary inputs x words) uint64 words.
+
+        Args:
+        vectors: A (vectors x inputs) array of 0/1 values.
+        inputs (list): The net of each column; defaults to primary_inputs(). Inverted names such as
+        "a_" are accepted.
+
+        Returns:
+        ndarray: One row of words per primary input, in primary_inputs() order.
+        """
+        if np is None:
+            raise Exception("NumPy is required for the uint64 simulation backends")
+        schedule = self.levelize()
+        words = pack_vectors(vectors)
+        ones = np.full(words.shape[1], np.iinfo(np.uint64).max, dtype=np.uint64)
+        values = self.resolve_inputs(dict(zip(inputs or schedule.inputs, words)), schedule.inputs, ones)
+        packed = np.empty((len(schedule.inputs), words.shape[1]), dtype=np.uint64)
+        for row, net in enumerate(schedule.inputs):
+            packed[row] = values[net]
+        return packed
+
+    def simulate_numpy(self, vectors, inputs=None, packed=False):
+        """
+        Simulates a batch of test vectors with one NumPy uint64 array per net, 64 vectors per word.
+
+        Args:
+        vectors: A (vectors x inputs) array of 0/1 values.
+        inputs (list): The net of each column; defaults to primary_inputs(). Inverted names such as
+        "a_" are accepted.
+        packed (bool): Return the packed words instead of one row per vector.
+
+        Returns:
+        ndarray: Columns ordered as sorted(output_vars); a (vectors x outputs) uint8 array, or a
+        (outputs x words) uint64 array when packed.
+        """
+        if np is None:
+            raise Exception("NumPy is required for the uint64 simulation backends")
+        vectors = np.asarray(vectors)
+        schedule = self.levelize()
+        words = self.pack_inputs(vectors, inputs)
+        ones = np.full(words.shape[1], np.iinfo(np.uint64).max, dtype=np.uint64)
+        values = dict(zip(schedule.inputs, words))
+        self.propagate_words(values, ones)
+        outputs = np.zeros((len(self.output_vars), words.shape[1]), dtype=np.uint64)
+        for row, var in enumerate(sorted(self.output_vars)):
+            outputs[row] = values[var]
+        if packed:
+            return outputs
+        return unpack_vectors(outputs, len(vectors))
+
+    def simulate_stream(self, source, destination, format='csv', chunk_size=65536, inputs=None, backend='numpy'):
+        """
+        Simulates a stimulus file chunk by chunk, writing the outputs as it goes.
+
+        Only one chunk of vectors is held in memory at a time, so the file size is not limited by RAM.
+
+        Args:
+        source: Path of the stimulus, or a (vectors x inputs) array (e.g. a NumPy memmap) for 'npy'.
+        destination (str): Path of the output file.
+        format (str): 'csv' (a header row of net names, then one row of 0/1 per vector), 'bin' (each
+        vector packed into ceil(inputs / 8) bytes, least significant bit first) or 'npy' (a NumPy
+        array file, read through a memmap). Outputs are written in the same format, in sorted(output_vars) order.
+        chunk_size (int): Number of vectors simulated per chunk.
+        inputs (list): The net of each column for 'bin' and 'npy'; defaults to primary_inputs().
+        CSV files name their columns in the header.
+        backend (str): 'numpy' (simulate_numpy) or 'native' (simulate_native).
+
+        Returns:
+        int: The number of vectors simulated.
+        """
+        if np is None:
+            raise Exception("NumPy is required for streaming simulation")
+        if backend == 'numpy':
+            simulate_chunk = self.simulate_numpy
+        elif backend == 'native':
+            simulate_chunk = self.simulate_native
+        else:
+            raise Exception(f"Unknown simulation backend: {backend}")
+        inputs = inputs or self.primary_inputs()
+        outputs = sorted(self.output_vars)
+        total = 0
+
+        if format == 'csv':
+            with open(source, newline='') as in_file, open(destination, 'w', newline='') as out_file:
+                reader = csv.reader(in_file)
+                writer = csv.writer(out_file)
+                header = [name.strip() for name in next(reader)]
+                writer.writerow(outputs)
+                while True:
+                    rows = list(itertools.islice(reader, chunk_size))
+                    if not rows:
+                        break
+                    chunk = np.array(rows, dtype=np.uint8)
+                    writer.writerows(simulate_chunk(chunk, header).tolist())
+                    total += len(rows)
+        elif format == 'bin':
+            in_bytes = -(-len(inputs) // 8)
+            with open(source, 'rb') as in_file, open(destination, 'wb') as out_file:
+                while True:
+                    data = in_file.read(chunk_size * in_bytes)
+                    if not data:
+                        break
+                    packed = np.frombuffer(data, dtype=np.uint8).reshape(-1, in_bytes)
+                    chunk = np.unpackbits(packed, axis=1, bitorder='little')[:, :len(inputs)]
+                    result = simulate_chunk(chunk, inputs)
+                    out_file.write(np.packbits(result, axis=1, bitorder='little').tobytes())
+                    total += len(chunk)
+        elif format == 'npy':
+            vectors = source if isinstance(source, np.ndarray) else np.load(source, mmap_mode='r')
+            result = np.lib.format.open_memmap(destination, mode='w+', dtype=np.uint8,
+                                               shape=(len(vectors), len(outputs)))
+            for start in range(0, len(vectors), chunk_size):
+                chunk = np.asarray(vectors[start:start + chunk_size])
+                result[start:start + len(chunk)] = simulate_chunk(chunk, inputs)
+                total += len(chunk)
+            result.flush()
+            del result
+        else:
+            raise Exception(f"Unknown stimulus format: {format}")
+        return total
+
+    def simulate_parallel(self, vectors, inputs=None, packed=False, workers=None, shard_size=1 << 16):
+        """
+        Simulates a large batch of test vectors in a pool of worker processes.
+
+        The vectors are packed and split into shards of shard_size vectors. Every worker receives the
+        generated netlist once, through the pool initializer, and returns packed outputs per shard.
+
+        Takes and returns the same arrays as simulate_numpy; workers defaults to the number of CPUs.
+        """
+        if np is None:
+            raise Exception("NumPy is required for parallel simulation")
+        vectors = np.asarray(vectors)
+        schedule = self.levelize()
+        outputs = sorted(self.output_vars)
+        words = self.pack_inputs(vectors, inputs)
+        shard_words = max(1, shard_size // 64)
+        shards = [words[:, start:start + shard_words] for start in range(0, words.shape[1], shard_words)]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_simulation_worker,
+                                 initargs=(self.generate_python(), schedule.inputs, outputs)) as pool:
+            results = list(pool.map(simulate_shard, shards))
+
+        result = np.concatenate(results, axis=1) if results else np.zeros((len(outputs), 0), dtype=np.uint64)
+        if packed:
+            return result
+        return unpack_vectors(result, len(vectors))
+
+    def simulate_threaded(self, vectors, inputs=None, packed=False, workers=None, chunk_size=1 << 16,
+                          backend='numpy', cache_dir=None):
+        """
+        Simulates a batch of test vectors in a pool of threads sharing one compiled netlist.
+
+        Each chunk of chunk_size vectors is evaluated by NumPy kernels on whole word arrays (or by the
+        native shared object, called through ctypes), both of which release the GIL, so chunks run
+        concurrently without pickling anything. Every chunk writes its own slice of the result.
+
+        Takes and returns the same arrays as simulate_numpy; workers defaults to the number of CPUs and
+        backend is 'numpy' or 'native'.
+        """
+        if np is None:
+            raise Exception("NumPy is required for threaded simulation")
+        vectors = np.asarray(vectors)
+        schedule = self.levelize()
+        outputs = sorted(self.output_vars)
+        if backend == 'numpy':
+            netlist = CompiledNetlist(schedule.inputs, outputs, self.compile_python(cache_dir), False)
+        elif backend == 'native':
+            netlist = self.compile_native(cache_dir)
+        else:
+            raise Exception(f"Unknown simulation backend: {backend}")
+
+        words = self.pack_inputs(vectors, inputs)
+        result = np.empty((len(outputs), words.shape[1]), dtype=np.uint64)
+        chunk_words = max(1, chunk_size // 64)
+
+        def run_chunk(start):
+            result[:, start:start + chunk_words] = netlist(words[:, start:start + chunk_words])
+
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            list(pool.map(run_chunk, range(0, words.shape[1], chunk_words)))
+
+        if packed:
+            return result
+        return unpack_vectors(result, len(vectors))
+
+    def bitstream_hash(self):
+        """
+        Returns a hash identifying the mapped netlist: its LUTs, primary inputs and output variables.
+        """
+        netlist = {
+            "LUTs": [[lut.input, lut.output, lut.logic] for lut in self.LUTs_list],
+            "input_vars": self.primary_inputs(),
+            "output_vars": sorted(self.output_vars),
+            "flip_flops": self.flip_flops
+        }
+        return hashlib.sha256(json.dumps(netlist).encode()).hexdigest()
+
+    def generate_python(self, name='netlist', outputs=None):
+        """
+        Generates a straight-line Python function evaluating the mapped netlist.
+
+        The function takes the all-ones word followed by the primary inputs (in primary_inputs() order)
+        and returns the nets in outputs (by default the output variables, in sorted order). It has one
+        local per net and one expression per LUT in topological order, so it works on 0/1 values,
+        wide ints and NumPy uint64 arrays alike.
+        """
+        schedule = self.levelize()
+        local = {net: f"n_{net}" for net in schedule.inputs}
+        lines = [f"def {name}(ones, {', '.join(local[net] for net in schedule.inputs)}):"]
+        for _, output, literals, init, _ in schedule.steps:
+            local[output] = f"n_{output}"
+            lines.append(f"    {local[output]} = {words_expression(init, [local[lit] for lit in literals])}")
+        if outputs is None:
+            outputs = sorted(self.output_vars)
+        returned = [local[net] for net in outputs]
+        lines.append(f"    return ({', '.join(returned)}{',' if len(returned) == 1 else ''})")
+        return '\n'.join(lines) + '\n'
+
+    def compile_python(self, cache_dir=None, outputs=None):
+        """
+        Compiles the generated netlist function, caching the code object on disk.
+
+        The cache file is keyed by bitstream_hash(), the returned nets and the interpreter's cache tag,
+        so a design is only generated and compiled the first time it is seen. cache_dir defaults to
+        default_cache_dir().
+
+        Returns:
+        function: The compiled netlist function (see generate_python).
+        """
+        cache_dir = cache_dir or default_cache_dir()
+        if outputs is None:
+            outputs = sorted(self.output_vars)
+        digest = hashlib.sha256((self.bitstream_hash() + json.dumps(outputs)).encode()).hexdigest()
+        key = f"{digest}.{sys.implementation.cache_tag}"
+        path = os.path.join(cache_dir, key + '.code')
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                code = marshal.load(file)
+        else:
+            code = compile(self.generate_python(outputs=outputs), f"<netlist {key[:12]}>", 'exec')
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary file first so concurrent runs never read a partial cache entry
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as file:
+                marshal.dump(code, file)
+            os.replace(temp_path, path)
+
+        namespace = {}
+        exec(code, namespace)
+        return namespace['netlist']
+
+    def generate_c(self, name='netlist'):
+        """
+        Generates bit-parallel C source for the mapped netlist, with one uint64_t per net.
+
+        The entry point void name(const uint64_t *in, uint64_t *out, size_t n_words) reads an
+        (inputs x n_words) buffer in primary_inputs() order and writes an (outputs x n_words) buffer
+        in sorted(output_vars) order.
+        """
+        schedule = self.levelize()
+        lines = [
+            "#include <stddef.h>",
+            "#include <stdint.h>",
+            "",
+            f"void {name}(const uint64_t *in, uint64_t *out, size_t n_words)",
+            "{",
+            "    const uint64_t ones = ~(uint64_t)0;",
+            "    for (size_t w = 0; w < n_words; w++) {"
+        ]
+        for i, net in enumerate(schedule.inputs):
+            lines.append(f"        const uint64_t n_{net} = in[{i} * n_words + w];")
+        for _, output, literals, init, _ in schedule.steps:
+            lines.append(f"        const uint64_t n_{output} = {words_expression(init, [f'n_{lit}' for lit in literals])};")
+        for i, var in enumerate(sorted(self.output_vars)):
+            lines.append(f"        out[{i} * n_words + w] = n_{var};")
+        lines += ["    }", "}"]
+        return '\n'.join(lines) + '\n'
+
+    def compile_native(self, cache_dir=None, compiler=None):
+        """
+        Builds the generated C netlist into a shared object with the system compiler and loads it.
+
+        The source and the shared object are cached in cache_dir (default_cache_dir() by default), keyed
+        by bitstream_hash(). When no compiler is found, or the build fails, the compiled Python netlist
+        function is used instead.
+
+        Returns:
+        CompiledNetlist: The evaluator; its native attribute tells which backend is in use.
+        """
+        if np is None:
+            raise Exception("NumPy is required for the native simulation backend")
+        cache_dir = cache_dir or default_cache_dir()
+        schedule = self.levelize()
+        outputs = sorted(self.output_vars)
+        compiler = compiler or os.environ.get('CC') or shutil.which('cc') or shutil.which('gcc') or shutil.which('clang')
+        if compiler:
+            base = os.path.join(cache_dir, f"{self.bitstream_hash()}.{sys.platform}")
+            library = base + '.so'
+            try:
+                if not os.path.exists(library):
+                    os.makedirs(cache_dir, exist_ok=True)
+                    with open(base + '.c', 'w') as file:
+                        file.write(self.generate_c())
+                    temp_library = f"{library}.{os.getpid()}.tmp"
+                    subprocess.run([compiler, '-O2', '-shared', '-fPIC', '-o', temp_library, base + '.c'],
+                                   check=True, capture_output=True)
+                    os.replace(temp_library, library)
+                function = ctypes.CDLL(os.path.abspath(library)).netlist
+                function.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+                function.restype = None
+                return CompiledNetlist(schedule.inputs, outputs, function, True)
+            except (OSError, subprocess.CalledProcessError):
+                pass
+        return CompiledNetlist(schedule.inputs, outputs, self.compile_python(cache_dir), False)
+
+    def simulate_native(self, vectors, inputs=None, packed=False, cache_dir=None):
+        """
+        Simulates a batch of test vectors with the native backend (see compile_native).
+
+        Takes and returns the same arrays as simulate_numpy.
+        """
+        if np is None:
+            raise Exception("NumPy is required for the native simulation backend")
+        schedule = self.levelize()
+        if self._native is None or self._native[0] is not schedule:
+            self._native = (schedule, self.compile_native(cache_dir))
+        vectors = np.asarray(vectors)
+        words = self.pack_inputs(vectors, inputs)
+        outputs = self._native[1](words)
+        if packed:
+            return outputs
+        return unpack_vectors(outputs, len(vectors))
+
+    def simulate_compiled(self, input_assignment, ones=1, cache_dir=None):
+        """
+        Evaluates the design with the compiled netlist function.
+
+        Args:
+        input_assignment (dict): Maps every primary input to a value: 0/1, or words when ones is the
+        all-ones word of a bit-parallel run.
+        ones: The all-ones value.
+
+        Returns:
+        dict: The value of every output variable.
+        """
+        # The compiled function is kept for as long as the cached schedule is valid
+        schedule = self.levelize()
+        if self._compiled is None or self._compiled[0] is not schedule:
+            self._compiled = (schedule, self.compile_python(cache_dir))
+        inputs = schedule.inputs
+        values = self.resolve_inputs(input_assignment, inputs, ones)
+        results = self._compiled[1](ones, *(values[net] for net in inputs))
+        return dict(zip(sorted(self.output_vars), results))
+
     def display_all_info(self, truth_table_enable=0):
         """
         print all the information of the FPGA
@@ -278,6 +3199,8 @@ class VirFGPA:
 
         print("Input Variables:", ", ".join(sorted(self.input_vars)))
         print("Output Variables:", ", ".join(sorted(self.output_vars)))
+        if self.flip_flops:
+            print("Flip-flops:", ", ".join(f"{ff['d']} -> {ff['q']}" for ff in self.flip_flops))
 
         # Display LUT information
         print("LUT Information:")
@@ -287,7 +3210,7 @@ class VirFGPA:
             print(f"  Function: {lut.logic}")
             if truth_table_enable == 1:
                 print("  Truth Table:")
-                for key, value in lut.dic.items():
+                for key, value in lut.truth_table.items():
                     print(f"    {key}: {value}")
             print()
 
@@ -320,6 +3243,10 @@ class VirFGPA:
         print(f"4-input LUTs Usage: {used_4_input_LUTs}/{self.total_4_input_LUTs} ({percent_4_input_usage:.2f}%)")
         print(f"6-input LUTs Usage: {used_6_input_LUTs}/{self.total_6_input_LUTs} ({percent_6_input_usage:.2f}%)")
 
+        used_flip_flops = self.total_flip_flops - self.available_flip_flops
+        percent_flip_flop_usage = (used_flip_flops / self.total_flip_flops * 100) if self.total_flip_flops > 0 else 0
+        print(f"Flip-flops Usage: {used_flip_flops}/{self.total_flip_flops} ({percent_flip_flop_usage:.2f}%)")
+
     def draw_diagram(self):
         """
         Creates a visual representation of the FPGA layout with nodes for LUTs, input, and output variables.
@@ -344,147 +3271,161 @@ class VirFGPA:
                 dot.edge(str(start), str(end))
 
         # Connect input variables to their LUTs
-        for lut in self.LUTs_list:
+        for i, lut in enumerate(self.LUTs_list):
             for input_var in lut.input:
                 if input_var in self.input_vars:
-                    dot.edge(input_var, str(self.LUTs_list.index(lut)))
+                    dot.edge(input_var, str(i))
 
         # Connect LUTs to output variables
-        for lut in self.LUTs_list:
+        for i, lut in enumerate(self.LUTs_list):
             if lut.output in self.output_vars:
-                dot.edge(str(self.LUTs_list.index(lut)), lut.output + "_out")
+                dot.edge(str(i), lut.output + "_out")
+
+        # Add flip-flops between the LUT driving D and the LUTs and outputs reading Q
+        drivers = self.net_drivers()
+        readers = self.net_readers()
+        for ff in self.flip_flops:
+            node = "ff_" + ff["q"]
+            dot.node(node, f'DFF\n{ff["q"]}', shape='box', color='orange')
+            if ff["d"] in drivers:
+                dot.edge(str(drivers[ff["d"]]), node)
+            for j in readers.get(ff["q"], []):
+                dot.edge(node, str(j))
+            if ff["q"] in self.output_vars:
+                dot.edge(node, ff["q"] + "_out")
 
         # Render the diagram to a file (e.g., in PDF format)
         dot.render('fpga_diagram', view=True)
 
 
-# Example SOP Dictionary
-sop_dict = {
-    "X": [['a', 'a_'], ['a', 'c', 'b'], ['b', 'd']],
-    "Y": [['X', 'd']],
-    "Z": [['X', 'a'], ['X', 'c', 'd']],
-    "W": [['X', 'Y', 'Z'], ['X', 'Z', 'a'], ['X', 'Y']]
-}
-
-Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
-Vir_FPGA_instance.map_sop_to_LUTs()
-Vir_FPGA_instance.connect_LUT()
-Vir_FPGA_instance.output_bitstream()
-
-Vir_FPGA_instance2 = VirFGPA()
-Vir_FPGA_instance2.readin_bitstream()
-Vir_FPGA_instance2.display_all_info()
-Vir_FPGA_instance2.display_LUT_usage()
-#Vir_FPGA_instance2.draw_diagram()
-
-
-# Example SOP Dictionary 2
-
-sop_dict = {
-    "X": [['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p'],
-          ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'q'],
-          ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'r']],
-    "Y": [['X', 't'], ['X', 'r']]
-}
-
-Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
-Vir_FPGA_instance.map_sop_to_LUTs()
-Vir_FPGA_instance.connect_LUT()
-Vir_FPGA_instance.output_bitstream()
-
-Vir_FPGA_instance2 = VirFGPA()
-Vir_FPGA_instance2.readin_bitstream()
-Vir_FPGA_instance2.display_all_info()
-Vir_FPGA_instance2.display_LUT_usage()
-#Vir_FPGA_instance2.draw_diagram()
-
-
-sop_dict = {
-    "A": [['a', 'b', 'c'], ['d', 'e', 'f', 'g'], ['h', 'i', 'j']],
-    "B": [['k', 'l', 'm', 'n'], ['o', 'p', 'q', 'r', 's'], ['t', 'u', 'v']],
-    "C": [['w', 'x', 'y', 'z'], ['a_', 'b_', 'c_', 'd_'], ['e_', 'f_', 'g_', 'h_']],
-    "D": [['i_', 'j_', 'k_'], ['l_', 'm_', 'n_', 'o_'], ['p_', 'q_', 'r_', 's_']],
-    "E": [['t_', 'u_', 'v_', 'w_'], ['x_', 'y_', 'z_'], ['aa', 'bb', 'cc', 'dd']],
-    "F": [['ee', 'ff', 'gg', 'hh'], ['ii', 'jj', 'kk', 'll'], ['mm', 'nn', 'oo', 'pp']],
-    "G": [['qq', 'rr', 'ss'], ['tt', 'uu', 'vv', 'ww'], ['xx', 'yy', 'zz']],
-    "H": [['aaa', 'bbb', 'ccc'], ['ddd', 'eee', 'fff'], ['ggg', 'hhh', 'iii']],
-    "I": [['jjj', 'kkk', 'lll', 'mmm'], ['nnn', 'ooo', 'ppp', 'qqq'], ['rrr', 'sss', 'ttt']],
-    "J": [['uuu', 'vvv', 'www'], ['xxx', 'yyy', 'zzz'], ['aaaa', 'bbbb', 'cccc']]
-}
-
-Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
-Vir_FPGA_instance.map_sop_to_LUTs()
-Vir_FPGA_instance.connect_LUT()
-Vir_FPGA_instance.output_bitstream()
-
-Vir_FPGA_instance2 = VirFGPA()
-Vir_FPGA_instance2.readin_bitstream()
-Vir_FPGA_instance2.display_all_info()
-Vir_FPGA_instance2.display_LUT_usage()
-#Vir_FPGA_instance2.draw_diagram()
-
-sop_dict = {
-    "A": [['x', 'y', 'z'], ['a', 'b', 'c']],
-    "B": [['A', 'd', 'e'], ['f', 'g', 'h']],
-    "C": [['i', 'j', 'k', 'B'], ['l', 'm', 'n']],
-    "D": [['o', 'p', 'q', 'r'], ['C', 's', 't']],
-    "E": [['D', 'u', 'v'], ['w', 'x_', 'y_']],
-    "F": [['z_', 'aa', 'bb'], ['E', 'cc', 'dd']],
-    "G": [['ee', 'ff', 'gg', 'F'], ['hh', 'ii', 'jj']],
-    "H": [['kk', 'll', 'mm', 'G'], ['nn', 'oo', 'pp']],
-    "I": [['H', 'qq', 'rr'], ['ss', 'tt', 'uu']],
-    "J": [['vv', 'ww', 'xx'], ['yy', 'zz', 'I']]
-}
-
-Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
-Vir_FPGA_instance.map_sop_to_LUTs()
-Vir_FPGA_instance.connect_LUT()
-Vir_FPGA_instance.output_bitstream()
-
-Vir_FPGA_instance2 = VirFGPA()
-Vir_FPGA_instance2.readin_bitstream()
-Vir_FPGA_instance2.display_all_info()
-Vir_FPGA_instance2.display_LUT_usage()
-#Vir_FPGA_instance2.draw_diagram()
-
-sop_dict = {
-    "A": [['x', 'y', 'z'], ['B', 'c', 'd']],
-    "B": [['A', 'e', 'f'], ['g', 'h', 'i']],
-    "C": [['B', 'j', 'k'], ['l', 'm', 'n'], ['o', 'A', 'p']],
-    "D": [['q', 'r', 's'], ['C', 't', 'u']],
-    "E": [['D', 'v', 'w'], ['C', 'x_', 'y_']],
-    "F": [['z_', 'aa', 'bb'], ['E', 'cc', 'dd']],
-    "G": [['ee', 'ff', 'D'], ['hh', 'ii', 'E']],
-    "H": [['F', 'G', 'kk'], ['ll', 'mm', 'nn']],
-    "I": [['oo', 'pp', 'H'], ['qq', 'rr', 'C']],
-    "J": [['ss', 'tt', 'I'], ['uu', 'vv', 'ww'], ['xx', 'yy', 'zz']]
-}
-
-Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
-Vir_FPGA_instance.map_sop_to_LUTs()
-Vir_FPGA_instance.connect_LUT()
-Vir_FPGA_instance.output_bitstream()
-
-Vir_FPGA_instance2 = VirFGPA()
-Vir_FPGA_instance2.readin_bitstream()
-Vir_FPGA_instance2.display_all_info()
-Vir_FPGA_instance2.display_LUT_usage()
-#Vir_FPGA_instance2.draw_diagram()
-
-
-sop_dict = {
-    "A": [['x', 'B', 'z']],
-    "B": [['A', 'C', 'f'], ['A', 'C', 'i']],
-    "C": [['B', 'j', 'k'], ['A', 'B', 'n'], ['o', 'A', 'p']],
-}
-
-Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
-Vir_FPGA_instance.map_sop_to_LUTs()
-Vir_FPGA_instance.connect_LUT()
-Vir_FPGA_instance.output_bitstream(binary=True)
-
-Vir_FPGA_instance2 = VirFGPA()
-Vir_FPGA_instance2.readin_bitstream(binary=True)
-Vir_FPGA_instance2.display_all_info()
-Vir_FPGA_instance2.display_LUT_usage()
-Vir_FPGA_instance2.draw_diagram()
+if __name__ == "__main__":
+    # Example SOP Dictionary
+    sop_dict = {
+        "X": [['a', 'a_'], ['a', 'c', 'b'], ['b', 'd']],
+        "Y": [['X', 'd']],
+        "Z": [['X', 'a'], ['X', 'c', 'd']],
+        "W": [['X', 'Y', 'Z'], ['X', 'Z', 'a'], ['X', 'Y']]
+    }
+
+    Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
+    Vir_FPGA_instance.map_sop_to_LUTs()
+    Vir_FPGA_instance.connect_LUT()
+    Vir_FPGA_instance.output_bitstream()
+
+    Vir_FPGA_instance2 = VirFGPA()
+    Vir_FPGA_instance2.readin_bitstream()
+    Vir_FPGA_instance2.display_all_info()
+    Vir_FPGA_instance2.display_LUT_usage()
+    #Vir_FPGA_instance2.draw_diagram()
+
+
+    # Example SOP Dictionary 2
+
+    sop_dict = {
+        "X": [['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p'],
+              ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'q'],
+              ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'r']],
+        "Y": [['X', 't'], ['X', 'r']]
+    }
+
+    Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
+    Vir_FPGA_instance.map_sop_to_LUTs()
+    Vir_FPGA_instance.connect_LUT()
+    Vir_FPGA_instance.output_bitstream()
+
+    Vir_FPGA_instance2 = VirFGPA()
+    Vir_FPGA_instance2.readin_bitstream()
+    Vir_FPGA_instance2.display_all_info()
+    Vir_FPGA_instance2.display_LUT_usage()
+    #Vir_FPGA_instance2.draw_diagram()
+
+
+    sop_dict = {
+        "A": [['a', 'b', 'c'], ['d', 'e', 'f', 'g'], ['h', 'i', 'j']],
+        "B": [['k', 'l', 'm', 'n'], ['o', 'p', 'q', 'r', 's'], ['t', 'u', 'v']],
+        "C": [['w', 'x', 'y', 'z'], ['a_', 'b_', 'c_', 'd_'], ['e_', 'f_', 'g_', 'h_']],
+        "D": [['i_', 'j_', 'k_'], ['l_', 'm_', 'n_', 'o_'], ['p_', 'q_', 'r_', 's_']],
+        "E": [['t_', 'u_', 'v_', 'w_'], ['x_', 'y_', 'z_'], ['aa', 'bb', 'cc', 'dd']],
+        "F": [['ee', 'ff', 'gg', 'hh'], ['ii', 'jj', 'kk', 'll'], ['mm', 'nn', 'oo', 'pp']],
+        "G": [['qq', 'rr', 'ss'], ['tt', 'uu', 'vv', 'ww'], ['xx', 'yy', 'zz']],
+        "H": [['aaa', 'bbb', 'ccc'], ['ddd', 'eee', 'fff'], ['ggg', 'hhh', 'iii']],
+        "I": [['jjj', 'kkk', 'lll', 'mmm'], ['nnn', 'ooo', 'ppp', 'qqq'], ['rrr', 'sss', 'ttt']],
+        "J": [['uuu', 'vvv', 'www'], ['xxx', 'yyy', 'zzz'], ['aaaa', 'bbbb', 'cccc']]
+    }
+
+    Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
+    Vir_FPGA_instance.map_sop_to_LUTs()
+    Vir_FPGA_instance.connect_LUT()
+    Vir_FPGA_instance.output_bitstream()
+
+    Vir_FPGA_instance2 = VirFGPA()
+    Vir_FPGA_instance2.readin_bitstream()
+    Vir_FPGA_instance2.display_all_info()
+    Vir_FPGA_instance2.display_LUT_usage()
+    #Vir_FPGA_instance2.draw_diagram()
+
+    sop_dict = {
+        "A": [['x', 'y', 'z'], ['a', 'b', 'c']],
+        "B": [['A', 'd', 'e'], ['f', 'g', 'h']],
+        "C": [['i', 'j', 'k', 'B'], ['l', 'm', 'n']],
+        "D": [['o', 'p', 'q', 'r'], ['C', 's', 't']],
+        "E": [['D', 'u', 'v'], ['w', 'x_', 'y_']],
+        "F": [['z_', 'aa', 'bb'], ['E', 'cc', 'dd']],
+        "G": [['ee', 'ff', 'gg', 'F'], ['hh', 'ii', 'jj']],
+        "H": [['kk', 'll', 'mm', 'G'], ['nn', 'oo', 'pp']],
+        "I": [['H', 'qq', 'rr'], ['ss', 'tt', 'uu']],
+        "J": [['vv', 'ww', 'xx'], ['yy', 'zz', 'I']]
+    }
+
+    Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
+    Vir_FPGA_instance.map_sop_to_LUTs()
+    Vir_FPGA_instance.connect_LUT()
+    Vir_FPGA_instance.output_bitstream()
+
+    Vir_FPGA_instance2 = VirFGPA()
+    Vir_FPGA_instance2.readin_bitstream()
+    Vir_FPGA_instance2.display_all_info()
+    Vir_FPGA_instance2.display_LUT_usage()
+    #Vir_FPGA_instance2.draw_diagram()
+
+    sop_dict = {
+        "A": [['x', 'y', 'z'], ['B', 'c', 'd']],
+        "B": [['A', 'e', 'f'], ['g', 'h', 'i']],
+        "C": [['B', 'j', 'k'], ['l', 'm', 'n'], ['o', 'A', 'p']],
+        "D": [['q', 'r', 's'], ['C', 't', 'u']],
+        "E": [['D', 'v', 'w'], ['C', 'x_', 'y_']],
+        "F": [['z_', 'aa', 'bb'], ['E', 'cc', 'dd']],
+        "G": [['ee', 'ff', 'D'], ['hh', 'ii', 'E']],
+        "H": [['F', 'G', 'kk'], ['ll', 'mm', 'nn']],
+        "I": [['oo', 'pp', 'H'], ['qq', 'rr', 'C']],
+        "J": [['ss', 'tt', 'I'], ['uu', 'vv', 'ww'], ['xx', 'yy', 'zz']]
+    }
+
+    Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
+    Vir_FPGA_instance.map_sop_to_LUTs()
+    Vir_FPGA_instance.connect_LUT()
+    Vir_FPGA_instance.output_bitstream()
+
+    Vir_FPGA_instance2 = VirFGPA()
+    Vir_FPGA_instance2.readin_bitstream()
+    Vir_FPGA_instance2.display_all_info()
+    Vir_FPGA_instance2.display_LUT_usage()
+    #Vir_FPGA_instance2.draw_diagram()
+
+
+    sop_dict = {
+        "A": [['x', 'B', 'z']],
+        "B": [['A', 'C', 'f'], ['A', 'C', 'i']],
+        "C": [['B', 'j', 'k'], ['A', 'B', 'n'], ['o', 'A', 'p']],
+    }
+
+    Vir_FPGA_instance = VirFGPA(sop_dict, 100, 0)
+    Vir_FPGA_instance.map_sop_to_LUTs()
+    Vir_FPGA_instance.connect_LUT()
+    Vir_FPGA_instance.output_bitstream(binary=True)
+
+    Vir_FPGA_instance2 = VirFGPA()
+    Vir_FPGA_instance2.readin_bitstream(binary=True)
+    Vir_FPGA_instance2.display_all_info()
+    Vir_FPGA_instance2.display_LUT_usage()
+    Vir_FPGA_instance2.draw_diagram()
@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Virtual_FPGA.py is a single module at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Virtual_FPGA import VirFGPA
+
+
+@pytest.fixture(autouse=True)
+def netlist_cache(tmp_path_factory, monkeypatch):
+    """
+    Keeps the compiled netlist cache of the tests out of the user's cache directory.
+    """
+    monkeypatch.setenv('VIRTUAL_FPGA_CACHE', str(tmp_path_factory.getbasetemp() / 'netlist_cache'))
+
+
+def random_sop(seed, n_inputs=8, n_outputs=12, max_terms=3, max_literals=5):
+    """
+    Builds a random loop-free SOP dictionary; later outputs may read earlier ones.
+    """
+    rng = random.Random(seed)
+    nets = [f'i{k}' for k in range(n_inputs)]
+    sop = {}
+    for o in range(n_outputs):
+        sop[f'O{o}'] = [[rng.choice(nets) + rng.choice(['', '_']) for _ in range(rng.randint(1, max_literals))]
+                        for _ in range(rng.randint(1, max_terms))]
+        nets.append(f'O{o}')
+    return sop
+
+
+@pytest.fixture
+def random_design():
+    """
+    Returns a factory of mapped random designs, mixing 4- and 6-input LUTs.
+    """
+    def make(seed, **options):
+        fpga = VirFGPA(random_sop(seed, **options), 10000, 10000)
+        fpga.map_sop_to_LUTs()
+        fpga.connect_LUT()
+        return fpga
+    return make
+
+
+@pytest.fixture
+def registered_design():
+    """
+    Returns a two-register design: A <= x & B_ | A & x_ and B <= A & B_, with both registers starting at 0.
+    """
+    fpga = VirFGPA({'A': [['x', 'B_'], ['A', 'x_']], 'B': [['A', 'B_']]}, 10, 0, registered_outputs=['A', 'B'])
+    fpga.map_sop_to_LUTs()
+    fpga.connect_LUT()
+    return fpga
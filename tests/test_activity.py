@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from Virtual_FPGA import VirFGPA, count_toggles
+
+
+def test_count_toggles_matches_naive_count():
+    rng = random.Random(0)
+    for n_vectors in range(70):
+        for _ in range(20):
+            word = rng.getrandbits(n_vectors + 3)
+            bits = [word >> i & 1 for i in range(n_vectors)]
+            # Bits past n_vectors are not vectors and must be ignored
+            assert count_toggles(word, n_vectors) == sum(a != b for a, b in zip(bits, bits[1:]))
+
+
+def vector_values(fpga, vector):
+    """
+    Evaluates every net for one vector, LUT by LUT in levelized order.
+    """
+    values = dict(vector)
+    for i, *_ in fpga.levelize().steps:
+        lut = fpga.LUTs_list[i]
+        values[lut.output] = lut.evaluate([values[pin.rstrip("_'")] for pin in lut.input])
+    return values
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_switching_activity_matches_vector_by_vector(random_design, seed):
+    fpga = random_design(seed)
+    n_vectors = 50
+    rng = random.Random(seed)
+    words = {name: rng.getrandbits(n_vectors) for name in fpga.primary_inputs()}
+    per_vector = [vector_values(fpga, {name: word >> p & 1 for name, word in words.items()})
+                  for p in range(n_vectors)]
+    toggles = fpga.switching_activity(words, n_vectors)
+    for net in per_vector[0]:
+        assert toggles[net] == sum(a[net] != b[net] for a, b in zip(per_vector, per_vector[1:]))
+
+    readers = {}
+    for i, lut in enumerate(fpga.LUTs_list):
+        for lit in set(pin.rstrip("_'") for pin in lut.input):
+            readers.setdefault(lit, []).append(i)
+    for entry, lut in zip(fpga.activity_report(words, n_vectors), fpga.LUTs_list):
+        assert entry["output"] == lut.output
+        assert entry["fanout"] == len(readers.get(lut.output, ()))
+        assert entry["toggles"] == toggles[lut.output]
+        assert entry["activity"] == toggles[lut.output] / (n_vectors - 1)
+
+
+def test_estimate_dynamic_power():
+    report = [{"type": 4, "fanout": 2, "activity": 0.5}, {"type": 6, "fanout": 0, "activity": 1.0}]
+    # 0.5 * 0.5 * (1.0 + 2 * 0.5) + 0.5 * 1.0 * 1.5
+    assert VirFGPA.estimate_dynamic_power(report) == pytest.approx(1.25)
+    assert VirFGPA().estimate_dynamic_power(report, {4: 2.0, 6: 2.0}, 0.0, voltage=2.0, frequency=10.0) == \
+        pytest.approx(0.5 * 4 * 10 * (0.5 * 2.0 + 1.0 * 2.0))
@@ -0,0 +1,46 @@
+import pytest
+
+import Virtual_FPGA
+from Virtual_FPGA import FaultSimulator
+
+
+def exhaustive_words(inputs):
+    """
+    Packs every assignment of the primary inputs into one word per input.
+    """
+    n = len(inputs)
+    return {name: sum(1 << p for p in range(1 << n) if p >> (n - 1 - j) & 1) for j, name in enumerate(inputs)}
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_deterministic_generation_is_complete(random_design, seed):
+    fpga = random_design(seed, n_inputs=10, n_outputs=10)
+    simulator = FaultSimulator(fpga)
+    n_vectors = 1 << len(simulator.inputs)
+    exhaustive = simulator.run(exhaustive_words(simulator.inputs), n_vectors, word_size=n_vectors)
+
+    result = fpga.generate_tests(random_patterns=0, backtrack_limit=10 ** 6, seed=seed)
+    assert result["aborted"] == []
+    assert set(result["detected"]) == set(exhaustive["detected"])
+    assert not set(result["redundant"]) & set(exhaustive["detected"])
+    assert set(result["detected"]) | set(result["redundant"]) == set(simulator.faults())
+    assert result["coverage"] == exhaustive["coverage"]
+
+    # The reported patterns detect exactly the reported faults
+    patterns = result["patterns"]
+    replay = simulator.run(Virtual_FPGA.TestGenerator(fpga).pack(patterns), len(patterns))
+    assert replay["detected"] == result["detected"]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_podem_cubes_detect_their_fault(random_design, seed):
+    fpga = random_design(seed, n_inputs=10, n_outputs=10)
+    generator = Virtual_FPGA.TestGenerator(fpga, backtrack_limit=10 ** 6, seed=seed)
+    for fault in generator.simulator.faults():
+        status, cube = generator.podem(fault)
+        if status != "detected":
+            continue
+        # Every filling of the unassigned inputs must detect the fault
+        patterns = [generator.fill(cube) for _ in range(8)]
+        result = generator.simulator.run(generator.pack(patterns), len(patterns), [fault])
+        assert result["detected"].get(fault) == 0
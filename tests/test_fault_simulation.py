@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from Virtual_FPGA import FaultSimulator, VirFGPA
+
+
+def random_words(fpga, n_vectors, seed):
+    rng = random.Random(seed)
+    return {name: rng.getrandbits(n_vectors) for name in fpga.primary_inputs()}
+
+
+def detects(fpga, fault, vector):
+    """
+    Tells whether one input vector detects a fault, by scalar simulation of the good and faulty designs.
+    """
+    i, net, value = fault
+    observed = set(fpga.output_vars) | {ff["d"] for ff in fpga.flip_flops}
+
+    def run(inject):
+        values = dict(vector)
+        for j, output, literals, init, weights in fpga.levelize().steps:
+            address = 0
+            for weight, lit in zip(weights, literals):
+                bit = value if inject and j == i and lit == net else values[lit]
+                if bit:
+                    address += weight
+            values[output] = value if inject and j == i and output == net else init >> address & 1
+        return {name: values[name] for name in observed if name in values}
+
+    return run(False) != run(True)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_fault_simulation_matches_scalar_injection(random_design, seed):
+    fpga = random_design(seed, n_outputs=6)
+    n_vectors = 100
+    words = random_words(fpga, n_vectors, seed)
+    vectors = [{name: word >> p & 1 for name, word in words.items()} for p in range(n_vectors)]
+    result = fpga.simulate_faults(words, n_vectors)
+
+    faults = FaultSimulator(fpga).faults()
+    assert result["total"] == len(faults)
+    for fault in faults:
+        first = next((p for p, vector in enumerate(vectors) if detects(fpga, fault, vector)), None)
+        assert result["detected"].get(fault) == first
+    assert set(result["undetected"]) == {fault for fault in faults if fault not in result["detected"]}
+    assert result["coverage"] == len(result["detected"]) / len(faults)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_collapsed_simulation_matches_every_fault(random_design, seed):
+    fpga = random_design(seed, n_outputs=15)
+    simulator = FaultSimulator(fpga)
+    faults = simulator.faults()
+    groups = simulator.collapse(faults)
+    assert sorted(fault for group in groups.values() for fault in group) == sorted(faults)
+
+    n_vectors = 256
+    words = random_words(fpga, n_vectors, seed)
+    result = simulator.run(words, n_vectors, word_size=64)
+    for fault in faults:
+        # Uncollapsed reference: the first block and pattern where this very fault shows up
+        first = None
+        for start in range(0, n_vectors, 64):
+            ones = (1 << 64) - 1
+            good = simulator.good_values({name: word >> start & ones for name, word in words.items()}, ones)
+            word = simulator.detect(fault, good, ones)
+            if word:
+                first = start + (word & -word).bit_length() - 1
+                break
+        assert result["detected"].get(fault) == first
+
+
+def test_registers_are_scanned():
+    fpga = VirFGPA({'A': [['x', 'B_'], ['A', 'x_']], 'B': [['A', 'B_']]}, 10, 0, registered_outputs=['A', 'B'])
+    fpga.map_sop_to_LUTs()
+    words = random_words(fpga, 64, 0)
+    assert fpga.simulate_faults(words, 64)["coverage"] == 1.0
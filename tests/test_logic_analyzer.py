@@ -0,0 +1,76 @@
+import itertools
+
+import pytest
+
+from Virtual_FPGA import LogicAnalyzer
+
+# With x held at 1, registered_design cycles through (A, B) = (0, 0), (1, 0), (1, 1), so B rises at
+# cycles 2, 5, 8, ... and falls at cycles 3, 6, ...
+CYCLE = [(0, 0), (1, 0), (1, 1)]
+
+
+def sample(t):
+    return t, CYCLE[t % 3]
+
+
+def run(fpga, **options):
+    return fpga.logic_analyzer(itertools.repeat({'x': 1}), ['A', 'B'], **options)
+
+
+def test_edge_trigger_rearms_after_each_capture(registered_design):
+    analyzer = run(registered_design, trigger={'B': 'R'}, depth=4, pre_trigger=1, max_captures=2)
+    assert analyzer.done
+    # The pre-trigger buffer is emptied when a capture is stored, so the second window starts at its trigger
+    assert analyzer.captures == [
+        {"trigger": 2, "samples": [sample(1), sample(2), sample(3), sample(4)]},
+        {"trigger": 5, "samples": [sample(5), sample(6), sample(7), sample(8)]},
+    ]
+
+
+@pytest.mark.parametrize("trigger, time", [
+    ({'B': 'F'}, 3),
+    ({'A': 'B'}, 1),
+    ({'A': 1, 'B': 1}, 2),
+    ({'A': 0}, 0),
+    ({'A': 'R', 'B': 0}, 1),
+    ({'A': 'F', 'B': 0}, 3),
+])
+def test_trigger_conditions(registered_design, trigger, time):
+    analyzer = run(registered_design, trigger=trigger, depth=3, pre_trigger=2)
+    # With depth == pre_trigger + 1 the window ends on the trigger sample
+    assert analyzer.captures == [{"trigger": time, "samples": [sample(t) for t in range(max(time - 2, 0), time + 1)]}]
+
+
+def test_pre_trigger_buffer_refills(registered_design):
+    analyzer = run(registered_design, trigger={'B': 'R'}, depth=3, pre_trigger=2, max_captures=3)
+    assert [capture["trigger"] for capture in analyzer.captures] == [2, 5, 8]
+    assert analyzer.captures[0]["samples"] == [sample(0), sample(1), sample(2)]
+    # Samples after a stored capture refill the pre-trigger buffer
+    assert analyzer.captures[1]["samples"] == [sample(3), sample(4), sample(5)]
+
+
+def test_finish_keeps_a_truncated_capture(registered_design, tmp_path):
+    analyzer = registered_design.logic_analyzer([{'x': 1}] * 4, ['A'], {'B': 'R'}, depth=8, pre_trigger=2)
+    assert analyzer.captures == [{"trigger": 2, "samples": [sample(t) for t in range(4)]}]
+
+    path = tmp_path / 'capture.vcd'
+    analyzer.dump_vcd(analyzer.captures[0], str(path))
+    assert path.read_text().split("$enddefinitions $end\n")[1] == "#0\n0!\n0\"\n#1\n1!\n#2\n1\"\n#3\n0!\n0\"\n#4\n"
+
+    path = tmp_path / 'capture.txt'
+    analyzer.dump(analyzer.captures[0], str(path))
+    lines = path.read_text().splitlines()
+    assert lines[0] == "Trigger at cycle 2"
+    assert lines[4] == "T       2 1 1"
+
+
+def test_no_trigger_makes_no_capture(registered_design):
+    analyzer = registered_design.logic_analyzer([{'x': 0}] * 10, ['A', 'B'], {'A': 'R'})
+    assert analyzer.captures == [] and not analyzer.done
+
+
+def test_rejects_bad_settings():
+    with pytest.raises(Exception):
+        LogicAnalyzer(['A'], {'B': 'R'}, depth=4, pre_trigger=4)
+    with pytest.raises(Exception):
+        LogicAnalyzer(['A'], {'B': 'X'})
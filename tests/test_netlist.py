@@ -0,0 +1,82 @@
+import pytest
+
+from Virtual_FPGA import LUTBank, VirFGPA
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_connect_lut_matches_pairwise_rule(random_design, seed):
+    fpga = random_design(seed, n_outputs=30)
+    luts = list(fpga.LUTs_list)
+    expected = {}
+    for i, lut_a in enumerate(luts):
+        for j, lut_b in enumerate(luts):
+            if i != j and lut_a.output in lut_b.input:
+                expected.setdefault(i, []).append(j)
+    assert fpga.connect_LUT() == expected
+    assert list(fpga.connection) == list(expected)
+
+
+def test_lut_bank_literals_do_not_grow():
+    bank = LUTBank()
+    wide = bank.add(list('abcdefg'), 'Q', 'Q = a & b & c & d & e & f_ & g')
+    narrow = bank.add(['a', 'Q'], 'R', 'R = a_ | Q')
+    for _ in range(5):
+        assert bank[wide].init == 1 << 0b1111101
+        assert bank[narrow].init == 0b1101
+    assert bank[wide].literals == list('abcdefg')
+    assert len(bank.literal_ids) == 9
+
+    fpga = VirFGPA({'O': [['a', 'b_'], ['c']], 'P': [['O', 'a_']]})
+    fpga.map_sop_to_LUTs()
+    fpga.build_truth_tables()
+    size = len(fpga.LUTs_list.literal_ids)
+    fpga.build_truth_tables()
+    fpga.build_truth_tables('int')
+    assert len(fpga.LUTs_list.literal_ids) == size
+
+    # New logic gets a fresh range
+    fpga.LUTs_list[0].logic = 'O = a'
+    assert fpga.LUTs_list[0].literals == ['a']
+
+
+# A <= x & B_ | A & x_ and B <= A & B_ in registered_design, computed by hand for this stimulus
+X = [1, 1, 0, 1, 0, 0, 1, 1]
+STATES = [(0, 0), (1, 0), (1, 1), (1, 0), (1, 1), (1, 0), (1, 1), (0, 0)]
+
+
+def test_simulate_cycles_sequence(registered_design):
+    outputs = list(registered_design.simulate_cycles([{'x': x} for x in X]))
+    assert [(out['A'], out['B']) for out in outputs] == STATES
+
+    # The state is updated in place and can resume a run
+    state = {}
+    list(registered_design.simulate_cycles([{'x': x} for x in X[:3]], state))
+    assert state == {'A': 1, 'B': 0}
+    outputs = list(registered_design.simulate_cycles([{'x': x} for x in X[3:]], state))
+    assert [(out['A'], out['B']) for out in outputs] == STATES[3:]
+
+    # Bit-parallel: lane 1 starts from A = 1
+    outputs = list(registered_design.simulate_cycles([{'x': 0b11}] * 3, {'A': 0b10}, ones=0b11))
+    assert [(out['A'], out['B']) for out in outputs] == [(0b10, 0), (0b11, 0b10), (0b01, 0b01)]
+
+
+def test_flip_flop_resources(registered_design):
+    assert registered_design.flip_flops == [{'d': 'Int3', 'q': 'A'}, {'d': 'Int5', 'q': 'B'}]
+    assert registered_design.available_flip_flops == registered_design.total_flip_flops - 2
+    fpga = VirFGPA({'A': [['x', 'A_']]}, 10, 0, total_flip_flops=0, registered_outputs=['A'])
+    with pytest.raises(Exception):
+        fpga.map_sop_to_LUTs()
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_bitstream_keeps_flip_flops(registered_design, tmp_path, monkeypatch, binary):
+    monkeypatch.chdir(tmp_path)
+    registered_design.output_bitstream(binary)
+    fpga = VirFGPA()
+    fpga.readin_bitstream(binary)
+    assert fpga.flip_flops == registered_design.flip_flops
+    assert fpga.registered_outputs == {'A', 'B'}
+    assert fpga.total_flip_flops == registered_design.total_flip_flops
+    assert fpga.available_flip_flops == registered_design.available_flip_flops
+    outputs = list(fpga.simulate_cycles([{'x': x} for x in X]))
+    assert [(out['A'], out['B']) for out in outputs] == STATES
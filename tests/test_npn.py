@@ -0,0 +1,73 @@
+import itertools
+import random
+
+import pytest
+
+from Virtual_FPGA import (LUT, VirFGPA, npn_canonical, npn_class_index, npn_classes, npn_heuristic,
+                          tt_flip_input, tt_permute_inputs)
+
+
+def npn_transform(init, k, rng):
+    """
+    Applies a random input permutation, input negation and output negation to a truth table.
+    """
+    perm = list(range(k))
+    rng.shuffle(perm)
+    t = tt_permute_inputs(init, k, perm)
+    for i in range(k):
+        if rng.getrandbits(1):
+            t = tt_flip_input(t, k, i)
+    if rng.getrandbits(1):
+        t ^= (1 << (1 << k)) - 1
+    return t
+
+
+def npn_orbit(init, k):
+    full = (1 << (1 << k)) - 1
+    orbit = set()
+    for perm in itertools.permutations(range(k)):
+        t = tt_permute_inputs(init, k, perm)
+        for flips in range(1 << k):
+            u = t
+            for i in range(k):
+                if flips >> i & 1:
+                    u = tt_flip_input(u, k, i)
+            orbit.add(u)
+            orbit.add(full ^ u)
+    return orbit
+
+
+@pytest.mark.parametrize("k, count", [(1, 2), (2, 4), (3, 14), (4, 222)])
+def test_npn_class_counts(k, count):
+    assert len(npn_classes(k)) == count
+
+
+@pytest.mark.parametrize("k", [2, 3, 4])
+def test_exact_canonical_form_is_npn_invariant(k):
+    rng = random.Random(k)
+    for _ in range(200):
+        init = rng.getrandbits(1 << k)
+        canonical = npn_canonical(init, k)
+        assert canonical == min(npn_orbit(init, k))
+        assert npn_canonical(npn_transform(init, k, rng), k) == canonical
+        assert npn_classes(k)[npn_class_index(init, k)] == canonical
+
+
+def test_heuristic_form_is_npn_equivalent():
+    rng = random.Random(5)
+    for _ in range(20):
+        init = rng.getrandbits(32)
+        assert npn_heuristic(init, 5) in npn_orbit(init, 5)
+
+
+def test_lut_npn_keys_group_equivalent_luts():
+    assert LUT(['a', 'b_'], 'X', 'X = a & b_').npn_key() == LUT(['b', 'a_'], 'Y', 'Y = b & a_').npn_key()
+    assert LUT(['a', 'b'], 'X', 'X = a & b').npn_key() == LUT(['a', 'b'], 'Y', 'Y = a | b').npn_key()
+    assert LUT(['a', 'b'], 'X', 'X = a & b').npn_key() != LUT(['a', 'b'], 'Y', 'Y = a ^ b').npn_key()
+
+    fpga = VirFGPA({'X': [['a', 'b']], 'Y': [['c', 'd_']]}, 10, 0)
+    fpga.map_sop_to_LUTs()
+    classes = fpga.group_npn_classes()
+    assert sorted(i for indices in classes.values() for i in indices) == list(range(len(fpga.LUTs_list)))
+    and_class = fpga.LUTs_list[0].npn_key()
+    assert len(classes[and_class]) == 2
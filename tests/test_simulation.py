@@ -0,0 +1,110 @@
+import csv
+import random
+
+import numpy as np
+import pytest
+
+import Virtual_FPGA
+from Virtual_FPGA import EventSimulator, VirFGPA
+
+
+def random_vectors(fpga, n_vectors, seed=0):
+    rng = random.Random(seed)
+    inputs = fpga.primary_inputs()
+    return [{name: rng.getrandbits(1) for name in inputs} for _ in range(n_vectors)]
+
+
+def reference(fpga, vectors):
+    """
+    Evaluates the LUTs one by one through LUT.evaluate, in a naive repeat-until-settled loop.
+    """
+    results = []
+    for vector in vectors:
+        values = dict(vector)
+        pending = list(fpga.LUTs_list)
+        while pending:
+            waiting = []
+            for lut in pending:
+                if all(lit in values for lit in lut.literals):
+                    values[lut.output] = lut.evaluate([values[pin.rstrip("_'")] for pin in lut.input])
+                else:
+                    waiting.append(lut)
+            assert len(waiting) < len(pending)
+            pending = waiting
+        results.append({var: values[var] for var in sorted(fpga.output_vars)})
+    return results
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_all_backends_agree(random_design, tmp_path, seed):
+    fpga = random_design(seed)
+    vectors = random_vectors(fpga, 150, seed)
+    expected = reference(fpga, vectors)
+    outputs = sorted(fpga.output_vars)
+    inputs = fpga.primary_inputs()
+    matrix = np.array([[vector[name] for name in inputs] for vector in vectors], dtype=np.uint8)
+    expected_matrix = np.array([[row[var] for var in outputs] for row in expected], dtype=np.uint8)
+
+    assert [fpga.simulate(vector) for vector in vectors] == expected
+    assert [fpga.simulate_compiled(vector) for vector in vectors] == expected
+    assert fpga.simulate_vectors(vectors) == expected
+    with_loops = [fpga.simulate_loops(vector)[0] for vector in vectors]
+    assert with_loops == expected
+
+    simulator = EventSimulator(fpga, vectors[0])
+    assert simulator.outputs() == expected[0]
+    assert [outputs for outputs, _ in simulator.run(vectors[1:])] == expected[1:]
+
+    np.testing.assert_array_equal(fpga.simulate_numpy(matrix), expected_matrix)
+    np.testing.assert_array_equal(fpga.simulate_native(matrix, cache_dir=str(tmp_path)), expected_matrix)
+    np.testing.assert_array_equal(fpga.simulate_threaded(matrix, workers=2, chunk_size=64), expected_matrix)
+    np.testing.assert_array_equal(fpga.simulate_threaded(matrix, workers=2, chunk_size=64, backend='native',
+                                                         cache_dir=str(tmp_path)), expected_matrix)
+    np.testing.assert_array_equal(fpga.simulate_parallel(matrix, workers=2, shard_size=64), expected_matrix)
+
+    source = tmp_path / 'stimulus.csv'
+    with open(source, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(inputs)
+        writer.writerows(matrix.tolist())
+    destination = tmp_path / 'outputs.csv'
+    assert fpga.simulate_stream(str(source), str(destination), chunk_size=64) == len(vectors)
+    with open(destination, newline='') as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == outputs
+    assert [[int(bit) for bit in row] for row in rows[1:]] == expected_matrix.tolist()
+
+
+def test_bit_parallel_words_match_scalar_simulation(random_design):
+    fpga = random_design(7)
+    vectors = random_vectors(fpga, 100, 7)
+    words = {name: sum(vector[name] << i for i, vector in enumerate(vectors)) for name in fpga.primary_inputs()}
+    result = fpga.simulate_words(words, len(vectors))
+    for i, vector in enumerate(vectors):
+        assert {var: word >> i & 1 for var, word in result.items()} == fpga.simulate(vector)
+
+
+def test_schedule_follows_logic_changes():
+    fpga = VirFGPA({"X": [['a', 'b']], "Y": [['X', 'c']]}, 10, 0)
+    fpga.map_sop_to_LUTs()
+    vector = {'a': 1, 'b': 1, 'c': 1}
+    assert fpga.simulate(vector) == {'X': 1, 'Y': 1}
+    assert fpga.simulate_compiled(vector) == {'X': 1, 'Y': 1}
+    fpga.LUTs_list[0].logic = "Int1 = a ^ b"
+    assert fpga.simulate(vector) == {'X': 0, 'Y': 0}
+    assert fpga.simulate_words(vector, 1) == {'X': 0, 'Y': 0}
+    assert fpga.simulate_compiled(vector) == {'X': 0, 'Y': 0}
+
+
+def test_numpy_backends_require_numpy(random_design, monkeypatch):
+    fpga = random_design(0)
+    monkeypatch.setattr(Virtual_FPGA, 'np', None)
+    with pytest.raises(Exception, match="NumPy is required"):
+        fpga.simulate_numpy([[0] * len(fpga.primary_inputs())])
+
+    # A netlist compiled earlier does not skip the check
+    monkeypatch.setattr(Virtual_FPGA, 'np', np)
+    fpga.simulate_native([[0] * len(fpga.primary_inputs())])
+    monkeypatch.setattr(Virtual_FPGA, 'np', None)
+    with pytest.raises(Exception, match="NumPy is required"):
+        fpga.simulate_native([[0] * len(fpga.primary_inputs())])
@@ -0,0 +1,133 @@
+import itertools
+import random
+
+import pytest
+
+from Virtual_FPGA import (LUT, truth_table_to_logic, tt_cofactor, tt_compose, tt_flip_input, tt_insert_input,
+                          tt_permute_inputs, tt_reduce_support, tt_support, tt_swap_inputs)
+
+
+def value(init, bits):
+    """
+    Reads a truth table row; the first input is the most significant address bit.
+    """
+    address = 0
+    for bit in bits:
+        address = address << 1 | bit
+    return init >> address & 1
+
+
+def rows(k):
+    return itertools.product([0, 1], repeat=k)
+
+
+@pytest.fixture
+def tables():
+    rng = random.Random(8)
+    return [(k, rng.getrandbits(1 << k)) for k in range(1, 6) for _ in range(10)]
+
+
+def test_flip_swap_and_permute(tables):
+    for k, init in tables:
+        for i in range(k):
+            flipped = tt_flip_input(init, k, i)
+            for bits in rows(k):
+                negated = list(bits)
+                negated[i] ^= 1
+                assert value(flipped, bits) == value(init, negated)
+        for i, j in itertools.combinations(range(k), 2):
+            swapped = tt_swap_inputs(init, k, i, j)
+            for bits in rows(k):
+                exchanged = list(bits)
+                exchanged[i], exchanged[j] = exchanged[j], exchanged[i]
+                assert value(swapped, bits) == value(init, exchanged)
+        perm = list(reversed(range(k)))
+        permuted = tt_permute_inputs(init, k, perm)
+        for bits in rows(k):
+            assert value(permuted, bits) == value(init, [bits[perm.index(i)] for i in range(k)])
+
+
+def test_cofactor_and_insert_input(tables):
+    for k, init in tables:
+        for i in range(k):
+            for v in (0, 1):
+                cofactor = tt_cofactor(init, k, i, v)
+                for bits in rows(k - 1):
+                    assert value(cofactor, bits) == value(init, bits[:i] + (v,) + bits[i:])
+        for i in range(k + 1):
+            widened = tt_insert_input(init, k, i)
+            for bits in rows(k + 1):
+                assert value(widened, bits) == value(init, bits[:i] + bits[i + 1:])
+
+
+def test_support_and_reduction():
+    # Y = a & c over the literals a, b, c: b is vacuous
+    lut = LUT(['a', 'b', 'c'], 'Y', 'Y = a & c | b & b_')
+    assert lut.support() == ['a', 'c']
+    assert lut.redundant_inputs() == ['b']
+    reduced = lut.reduce_support()
+    assert reduced.literals == ['a', 'c']
+    assert reduced.init == LUT(['a', 'c'], 'Y', 'Y = a & c').init
+
+    literals, init = tt_reduce_support(0b1010, ['a', 'b'])
+    assert literals == ['b'] and init == 0b10
+    assert tt_support(0b0110, 2) == [0, 1]
+
+
+def test_compose_matches_substitution():
+    rng = random.Random(3)
+    for _ in range(30):
+        f_literals = ['a', 'c', 'g']
+        g_literals = sorted(rng.sample(['a', 'b', 'd'], 2))
+        f_init = rng.getrandbits(1 << len(f_literals))
+        g_init = rng.getrandbits(1 << len(g_literals))
+        literals, init = tt_compose(f_init, f_literals, 'g', g_init, g_literals)
+        assert literals == sorted(set(f_literals) - {'g'} | set(g_literals))
+        for bits in rows(len(literals)):
+            env = dict(zip(literals, bits))
+            env['g'] = value(g_init, [env[lit] for lit in g_literals])
+            assert value(init, bits) == value(f_init, [env[lit] for lit in f_literals])
+
+
+def same_function(lut, literals, init):
+    """
+    Tells whether a LUT computes the truth table init over literals; the LUT may keep fewer literals
+    (constants have none).
+    """
+    for bits in rows(len(literals)):
+        env = dict(zip(literals, bits))
+        if value(lut.init, [env[lit] for lit in lut.literals]) != value(init, bits):
+            return False
+    return True
+
+
+def test_lut_algebra_and_logic_round_trip():
+    driver = LUT(['a', 'b'], 'X', 'X = a ^ b')
+    reader = LUT(['X', 'c'], 'Y', 'Y = X & c')
+    composed = reader.compose(driver)
+    assert composed.literals == ['a', 'b', 'c']
+    assert composed.init == LUT(['a', 'b', 'c'], 'Y', 'Y = (a ^ b) & c').init
+    assert reader.cofactor('c', 1).init == LUT(['X'], 'Y', 'Y = X').init
+
+    rng = random.Random(1)
+    for k in range(1, 5):
+        literals = ['p', 'q', 'r', 's'][:k]
+        for init in [0, (1 << (1 << k)) - 1] + [rng.getrandbits(1 << k) for _ in range(10)]:
+            assert same_function(LUT.from_truth_table('Q', literals, init), literals, init)
+            assert same_function(LUT(literals, 'Q', truth_table_to_logic('Q', literals, init)), literals, init)
+
+
+def test_evaluate_takes_input_pin_order():
+    lut = LUT(['c', 'a_'], 'Q', 'Q = c & a_')
+    assert lut.literals == ['a', 'c']
+    assert lut.weights == (1, 2)
+    assert [lut.evaluate([c, a]) for c in (0, 1) for a in (0, 1)] == [0, 0, 1, 0]
+    assert lut.evaluate_many([[1, 0], [1, 1]]) == [1, 0]
+    assert lut.lookup((0, 1)) and not lut.lookup((1, 1))
+    with pytest.raises(Exception):
+        lut.evaluate([1])
+
+    # Repeated nets share one weight
+    both = LUT(['a', 'a_', 'b'], 'Q', 'Q = a & b | a_ & b_')
+    assert both.weights == (2, 0, 1)
+    assert [both.evaluate([a, a, b]) for a in (0, 1) for b in (0, 1)] == [1, 0, 0, 1]
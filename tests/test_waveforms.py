@@ -0,0 +1,76 @@
+from Virtual_FPGA import VCDWriter
+
+# Stimulus of registered_design and the register values it gives, cycle by cycle:
+# A <= x & B_ | A & x_, B <= A & B_
+X = [1, 1, 0, 1, 0, 0]
+A = [0, 1, 1, 1, 1, 1]
+B = [0, 0, 1, 0, 1, 0]
+
+HEADER = """$version Virtual FPGA $end
+$timescale 1ns $end
+$scope module top $end
+$var wire 1 ! A $end
+$var wire 1 " B $end
+$var wire 1 # x $end
+$upscope $end
+$enddefinitions $end
+"""
+
+RECORDS = """#0
+0!
+0"
+1#
+#1
+1!
+#2
+1"
+0#
+#3
+0"
+1#
+#4
+1"
+0#
+#5
+0"
+#6
+"""
+
+
+def test_dump_vcd_records_changes_only(registered_design, tmp_path):
+    path = tmp_path / 'run.vcd'
+    assert registered_design.dump_vcd([{'x': x} for x in X], str(path)) == len(X)
+    assert path.read_text() == HEADER + RECORDS
+
+
+def test_dump_vcd_picks_one_lane(registered_design, tmp_path):
+    # Lane 1 replays the scalar run while lane 0 holds x at 0
+    stimuli = [{'x': x << 1} for x in X]
+    path = tmp_path / 'lane.vcd'
+    registered_design.dump_vcd(stimuli, str(path), ones=0b11, lane=1)
+    assert path.read_text() == HEADER + RECORDS
+
+    registered_design.dump_vcd(stimuli, str(path), ones=0b11, lane=0)
+    assert path.read_text() == HEADER + "#0\n0!\n0\"\n0#\n#6\n"
+
+
+def test_identifiers_are_unique_past_94_signals(tmp_path):
+    codes = [VCDWriter.identifier(i) for i in range(20000)]
+    assert codes[:2] == ['!', '"'] and codes[93] == '~' and codes[94] == '!!'
+    assert len(set(codes)) == len(codes)
+    assert all(33 <= ord(char) <= 126 for code in codes for char in code)
+
+    # A small buffer writes the same records as one final flush
+    signals = [f's{i}' for i in range(200)]
+    texts = []
+    for buffer_size in (1, 1 << 16):
+        path = tmp_path / f'wide{buffer_size}.vcd'
+        with VCDWriter(str(path), signals, buffer_size=buffer_size) as writer:
+            writer.sample(0, {name: 0 for name in signals})
+            writer.sample(1, {name: 0 for name in signals})
+            writer.sample(2, {name: int(name == 's150') for name in signals})
+        texts.append(path.read_text())
+    assert texts[0] == texts[1]
+    records = texts[0].split("$enddefinitions $end\n")[1].split("\n")
+    assert records[0] == '#0' and records[201] == '#2' and records[202] == '1' + VCDWriter.identifier(150)
+    assert len(records) == 204 and records[203] == ''